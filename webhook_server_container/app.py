@@ -1,4 +1,7 @@
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Dict
+import logging
 import os
 import sys
 
@@ -7,14 +10,30 @@ import requests
 import urllib3
 
 from fastapi import FastAPI
+from starlette.datastructures import Headers
 
-from webhook_server_container.libs.github_api import ProcessGithubWehook
+from webhook_server_container.libs.github_api import ProcessGithubWehook, shutdown_merge_state_relabel
 from webhook_server_container.utils.helpers import get_logger_with_params
 
-FASTAPI_APP: FastAPI = FastAPI(title="webhook-server")
 APP_URL_ROOT_PATH: str = "/webhook_server"
 urllib3.disable_warnings()
 
+# Per uvicorn worker, bounds the webhooks processed concurrently, extra deliveries wait in the executor queue
+WEBHOOK_EXECUTOR_MAX_WORKERS: int = int(os.environ.get("WEBHOOK_SERVER_MAX_WORKERS", "32"))
+WEBHOOK_EXECUTOR: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=WEBHOOK_EXECUTOR_MAX_WORKERS)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
+    try:
+        yield
+    finally:
+        # Drop the pending post-merge relabels instead of keeping the worker alive for their delay
+        shutdown_merge_state_relabel()
+
+
+FASTAPI_APP: FastAPI = FastAPI(title="webhook-server", lifespan=lifespan)
+
 
 @FASTAPI_APP.get(f"{APP_URL_ROOT_PATH}/healthcheck")
 def healthcheck() -> Dict[str, Any]:
@@ -39,10 +58,14 @@ async def process_webhook(request: Request) -> Dict[str, Any]:
         return process_failed_msg
 
     logger = get_logger_with_params(name=logger_name, repository_name=hook_data["repository"]["name"])
+    WEBHOOK_EXECUTOR.submit(process_webhook_data, hook_data=hook_data, headers=request.headers, logger=logger)
+    return {"status": requests.codes.accepted, "message": "process queued", "log_prefix": delivery_headers}
+
+
+def process_webhook_data(hook_data: Dict[Any, Any], headers: Headers, logger: logging.Logger) -> None:
     try:
-        api: ProcessGithubWehook = ProcessGithubWehook(hook_data=hook_data, headers=request.headers, logger=logger)
+        api: ProcessGithubWehook = ProcessGithubWehook(hook_data=hook_data, headers=headers, logger=logger)
         api.process()
-        return {"status": requests.codes.ok, "message": "process success", "log_prefix": delivery_headers}
 
     except Exception as exp:
         logger.error(f"Error: {exp}")
@@ -53,8 +76,4 @@ async def process_webhook(request: Request) -> Dict[str, Any]:
             file_name = os.path.split(exc_tb.tb_frame.f_code.co_filename)
             msg = f"Error: {exc_type}, File: {file_name}, Line: {exc_tb.tb_lineno}"
 
-        return {
-            "status": requests.codes.server_error,
-            "message": msg,
-            "log_prefix": delivery_headers,
-        }
+        logger.error(msg)
@@ -1,8 +1,23 @@
+import functools
 import os
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 import yaml
 
+# libyaml's C loader is several times faster, fall back to the pure Python loader when PyYAML is built without it
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader  # type: ignore[assignment]
+
+
+@functools.lru_cache(maxsize=1)
+def _load_config_data(config_path: str, mtime: float) -> Dict[str, Any]:
+    # mtime is part of the cache key so an edited config file is parsed again
+    with open(config_path) as fd:
+        return yaml.load(fd, Loader=YamlSafeLoader)
+
 
 class Config:
     def __init__(self) -> None:
@@ -15,9 +30,11 @@ class Config:
             raise FileNotFoundError(f"Config file {self.config_path} not found")
 
     @property
-    def data(self) -> Dict[str, Any]:
-        with open(self.config_path) as fd:
-            return yaml.safe_load(fd)
+    def data(self) -> Mapping[str, Any]:
+        # Shared by all webhooks, hand out a read-only view instead of a copy. Copy nested values before mutating them
+        return MappingProxyType(
+            _load_config_data(config_path=self.config_path, mtime=os.path.getmtime(self.config_path))
+        )
 
     def repository_data(self, repository_name: str) -> Dict[str, Any]:
         return self.data["repositories"].get(repository_name, {})
@@ -1,22 +1,27 @@
 from __future__ import annotations
 
+import bisect
 import contextlib
+import functools
 import json
 import logging
 import os
 import random
 import re
 import shutil
+import tempfile
+import threading
 import time
+from collections import OrderedDict
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Callable, Dict, Generator, List, Optional, Set, Tuple
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, Generator, List, Optional, Set, Tuple
 from uuid import uuid4
 
 import requests
 import shortuuid
 import yaml
-from github import GithubException
+from github import Github, GithubException
 from github.Branch import Branch
 from github.CheckRun import CheckRun
 from github.Commit import Commit
@@ -24,9 +29,8 @@ from github.GithubException import UnknownObjectException
 from github.PullRequest import PullRequest
 from starlette.datastructures import Headers
 from stringcolor import cs
-from timeout_sampler import TimeoutExpiredError, TimeoutSampler
 
-from webhook_server_container.libs.config import Config
+from webhook_server_container.libs.config import Config, YamlSafeLoader
 from webhook_server_container.libs.jira_api import JiraApi
 from webhook_server_container.utils.constants import (
     ADD_STR,
@@ -73,13 +77,146 @@ from webhook_server_container.utils.github_repository_settings import (
 )
 from webhook_server_container.utils.helpers import (
     extract_key_from_dict,
+    get_api_user_login,
     get_api_with_highest_rate_limit,
     get_apis_and_tokes_from_config,
     get_github_repo_api,
+    get_requests_session,
     get_value_from_dicts,
     run_command,
 )
 
+# Parsed OWNERS files keyed by their git blob sha, a new sha means the file content changed
+OWNERS_CONTENT_CACHE_MAX_SIZE: int = 512
+_OWNERS_CONTENT_CACHE: OrderedDict[str, Any] = OrderedDict()
+_OWNERS_CONTENT_CACHE_LOCK = threading.Lock()
+
+# All OWNERS data of a repository keyed by the git tree sha, an unchanged tree needs no walk and no lookups at all
+OWNERS_TREE_CACHE_MAX_SIZE: int = 128
+_OWNERS_TREE_CACHE: OrderedDict[str, Dict[str, Dict[str, Any]]] = OrderedDict()
+
+# Repository labels colors keyed by repository full name, kept in sync by _add_label. Labels edited outside
+# the server are picked up once the entry expires or right away when GitHub disagrees with the cache
+REPOSITORY_LABELS_COLORS_TTL: int = 300
+_REPOSITORY_LABELS_COLORS: Dict[str, Tuple[float, Dict[str, str]]] = {}
+_REPOSITORY_LABELS_COLORS_LOCK = threading.Lock()
+
+# Branch protection required status checks keyed by repository full name and branch, protection rarely changes
+BRANCH_REQUIRED_STATUS_CHECKS_TTL: int = 300
+_BRANCH_REQUIRED_STATUS_CHECKS_CACHE: Dict[Tuple[str, str], Tuple[float, List[str]]] = {}
+_BRANCH_REQUIRED_STATUS_CHECKS_CACHE_LOCK = threading.Lock()
+
+# GitHub check run output text is limited to 65535 characters, keep the tail of each of the command stdout and stderr
+CHECK_RUN_TEXT_MAX_LENGTH: int = 65534
+CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE: int = 32000
+
+# Seconds to wait for Slack to answer, a stalled notification must not hold a webhook worker
+SLACK_REQUEST_TIMEOUT: int = 10
+
+# Seconds to wait after a merge before relabeling the opened pull requests by their merge state
+MERGE_STATE_RELABEL_DELAY: int = 30
+# The relabel runs on its own worker so no webhook worker waits for the delay. Due time by repository full name, a merge
+# while a relabel of the repository is pending pushes it back instead of queueing another one
+_MERGE_STATE_RELABEL_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="merge-state-relabel")
+_MERGE_STATE_RELABEL_DUE: Dict[str, float] = {}
+_MERGE_STATE_RELABEL_LOCK = threading.Lock()
+_MERGE_STATE_RELABEL_STOP = threading.Event()
+
+# Pull request size (additions + deletions) upper bounds, SIZE_LABELS[i] is used below SIZE_THRESHOLDS[i]
+SIZE_THRESHOLDS: Tuple[int, ...] = (20, 50, 100, 300, 500)
+SIZE_LABELS: Tuple[str, ...] = ("XS", "S", "M", "L", "XL", "XXL")
+
+# Labels set by pull request reviews, they no longer apply once new commits are pushed
+REVIEW_LABEL_PREFIXES: Tuple[str, ...] = (
+    APPROVED_BY_LABEL_PREFIX,
+    COMMENTED_BY_LABEL_PREFIX,
+    CHANGED_REQUESTED_BY_LABEL_PREFIX,
+    LGTM_BY_LABEL_PREFIX,
+)
+
+# Lowercase users review labels prefixes, labels are matched case-insensitively against them
+_APPROVED_BY_LABEL_PREFIX_LOWER: str = APPROVED_BY_LABEL_PREFIX.lower()
+_CHANGED_REQUESTED_BY_LABEL_PREFIX_LOWER: str = CHANGED_REQUESTED_BY_LABEL_PREFIX.lower()
+_LGTM_BY_LABEL_PREFIX_LOWER: str = LGTM_BY_LABEL_PREFIX.lower()
+# _classify_labels bucket for each users review label prefix
+_USER_LABEL_PREFIXES_BUCKETS: Tuple[Tuple[str, str], ...] = (
+    ("approvers", _APPROVED_BY_LABEL_PREFIX_LOWER),
+    ("change_requesters", _CHANGED_REQUESTED_BY_LABEL_PREFIX_LOWER),
+    ("lgtm", _LGTM_BY_LABEL_PREFIX_LOWER),
+)
+
+# Lines starting with '/', leading and trailing '/' are dropped from the captured command
+USER_COMMAND_RE = re.compile(r"^/+([^\r\n]*?)/*\r?$", re.MULTILINE)
+
+SUPPORTED_USER_COMMANDS: FrozenSet[str] = frozenset((
+    COMMAND_RETEST_STR,
+    COMMAND_CHERRY_PICK_STR,
+    COMMAND_ASSIGN_REVIEWERS_STR,
+    COMMAND_CHECK_CAN_MERGE_STR,
+    BUILD_AND_PUSH_CONTAINER_STR,
+    COMMAND_ASSIGN_REVIEWER_STR,
+    *USER_LABELS_DICT.keys(),
+))
+
+SUPPORTED_USER_LABELS_STR: str = "".join(f" * {label}\n" for label in USER_LABELS_DICT)
+
+# Colors a repository name can get in the log prefix
+LOG_PREFIX_EXCLUDED_COLORS: FrozenSet[str] = frozenset(("blue", "white", "black", "grey"))
+_LOG_PREFIX_COLORS: List[str] = [
+    _color["name"] for _color in cs.colors.values() if _color["name"].lower() not in LOG_PREFIX_EXCLUDED_COLORS
+]
+
+CHERRY_PICK_MANUAL_MSG_TEMPLATE: str = """**Manual cherry-pick is needed**
+Cherry pick failed for {commit_hash} to {target_branch}:
+To cherry-pick run:
+```
+git remote update
+git checkout {target_branch}
+git pull origin {target_branch}
+git checkout -b {local_branch_name}
+git cherry-pick {commit_hash}
+git push origin {local_branch_name}
+```"""
+
+# Only the supported retest section depends on the repository configuration
+WELCOME_MSG_TEMPLATE: str = f"""
+Report bugs in [Issues](https://github.com/myakove/github-webhook-server/issues)
+
+The following are automatically added:
+ * Add reviewers from OWNER file (in the root of the repository) under reviewers section.
+ * Set PR size label.
+ * New issue is created for the PR. (Closed when PR is merged/closed)
+ * Run [pre-commit](https://pre-commit.ci/) if `.pre-commit-config.yaml` exists in the repo.
+
+Available user actions:
+ * To mark PR as WIP comment `/wip` to the PR, To remove it from the PR comment `/wip cancel` to the PR.
+ * To block merging of PR comment `/hold`, To un-block merging of PR comment `/hold cancel`.
+ * To mark PR as verified comment `/verified` to the PR, to un-verify comment `/verified cancel` to the PR.
+        verified label removed on each new commit push.
+ * To cherry pick a merged PR comment `/cherry-pick <target branch to cherry-pick to>` in the PR.
+    * Multiple target branches can be cherry-picked, separated by spaces. (`/cherry-pick branch1 branch2`)
+    * Cherry-pick will be started when PR is merged
+ * To build and push container image command `/build-and-push-container` in the PR (tag will be the PR number).
+    * You can add extra args to the Podman build command
+        * Example: `/build-and-push-container --build-arg OPENSHIFT_PYTHON_WRAPPER_COMMIT=<commit_hash>`
+ * To add a label by comment use `/<label name>`, to remove, use `/<label name> cancel`
+ * To assign reviewers based on OWNERS file use `/assign-reviewers`
+ * To check if PR can be merged use `/check-can-merge`
+ * to assign reviewer to PR use `/assign-reviewer @<reviewer>`
+
+<details>
+<summary>Supported /retest check runs</summary>
+
+{{retest_msg}}
+</details>
+
+<details>
+<summary>Supported labels</summary>
+
+{SUPPORTED_USER_LABELS_STR}
+</details>
+    """
+
 
 class NoPullRequestError(Exception):
     pass
@@ -97,7 +234,85 @@ class ProcessGithubWehookError(Exception):
         return f"{self.err}"
 
 
+def schedule_merge_state_relabel(
+    github_api: Github, repository_full_name: str, logger: logging.Logger, log_prefix: str
+) -> None:
+    with _MERGE_STATE_RELABEL_LOCK:
+        pending = repository_full_name in _MERGE_STATE_RELABEL_DUE
+        _MERGE_STATE_RELABEL_DUE[repository_full_name] = time.monotonic() + MERGE_STATE_RELABEL_DELAY
+        if pending:
+            return
+
+        try:
+            _MERGE_STATE_RELABEL_EXECUTOR.submit(
+                _relabel_opened_pull_requests_by_merge_state,
+                **{
+                    "github_api": github_api,
+                    "repository_full_name": repository_full_name,
+                    "logger": logger,
+                    "log_prefix": log_prefix,
+                },
+            )
+        except RuntimeError as ex:
+            # Shutting down
+            del _MERGE_STATE_RELABEL_DUE[repository_full_name]
+            logger.debug(f"{log_prefix} Not relabeling opened pull requests after merge, {ex}")
+
+
+def shutdown_merge_state_relabel() -> None:
+    _MERGE_STATE_RELABEL_STOP.set()
+    _MERGE_STATE_RELABEL_EXECUTOR.shutdown(wait=True, cancel_futures=True)
+
+
+def _relabel_opened_pull_requests_by_merge_state(
+    github_api: Github, repository_full_name: str, logger: logging.Logger, log_prefix: str
+) -> None:
+    """
+    Labels the opened pull requests based on their mergeable state.
+
+    If the mergeable state is 'behind', the 'needs rebase' label is added.
+    If the mergeable state is 'dirty', the 'has conflicts' label is added.
+    """
+    while True:
+        with _MERGE_STATE_RELABEL_LOCK:
+            remaining = _MERGE_STATE_RELABEL_DUE[repository_full_name] - time.monotonic()
+            if remaining <= 0:
+                del _MERGE_STATE_RELABEL_DUE[repository_full_name]
+                break
+
+        if _MERGE_STATE_RELABEL_STOP.wait(timeout=remaining):
+            return
+
+    try:
+        # Its own repository object, the webhook that scheduled the relabel is done and cleaned up by now
+        for pull_request in github_api.get_repo(repository_full_name).get_pulls(state="open"):
+            merge_state = pull_request.mergeable_state
+            logger.debug(f"{log_prefix} Pull request {pull_request.number} mergeable state is {merge_state}")
+            if merge_state == "unknown":
+                continue
+
+            labels = {_label.name for _label in pull_request.labels}
+            for label, wanted in (
+                (NEEDS_REBASE_LABEL_STR, merge_state == "behind"),
+                (HAS_CONFLICTS_LABEL_STR, merge_state == "dirty"),
+            ):
+                if wanted and label not in labels:
+                    logger.info(f"{log_prefix} Adding pull request {pull_request.number} label {label}")
+                    pull_request.add_to_labels(label)
+
+                elif not wanted and label in labels:
+                    logger.info(f"{log_prefix} Removing pull request {pull_request.number} label {label}")
+                    pull_request.remove_from_labels(label)
+
+    except Exception as ex:
+        logger.error(f"{log_prefix} Failed to label opened pull requests after merge: {ex}")
+
+
 class ProcessGithubWehook:
+    # Repositories log colors, loaded once from log-colors.json and shared by all instances
+    _log_colors: ClassVar[Dict[str, str] | None] = None
+    _log_colors_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(self, hook_data: Dict[Any, Any], headers: Headers, logger: logging.Logger) -> None:
         self.logger = logger
         self.logger.name = "ProcessGithubWehook"
@@ -111,6 +326,23 @@ class ProcessGithubWehook:
         self.x_github_delivery: str = self.headers.get("X-GitHub-Delivery", "")
         self.github_event: str = self.headers["X-GitHub-Event"]
         self.owners_content: Dict[str, Any] = {}
+        # Pull request labels names by pull request number, see pull_request_labels_names
+        self._pull_request_labels: Dict[int, Set[str]] = {}
+        # Labels added (True) or removed (False) by this event that GitHub may not list yet, by pull request number
+        self._pull_request_labels_changes: Dict[int, Dict[str, bool]] = {}
+        self._pull_request_labels_lock = threading.Lock()
+        # Last state written for each check run during this event, keyed by check run name and head sha
+        self._check_runs_state: Dict[Tuple[str, str], str] = {}
+        self._check_runs_state_lock = threading.Lock()
+        # Check runs names in progress on GitHub by head sha, listed once per event
+        self._check_runs_in_progress: Dict[str, FrozenSet[str]] = {}
+        self._check_runs_in_progress_lock = threading.Lock()
+        # Local bare clone of the repository, cloned once per event and shared by the checks clones. Only used when
+        # more than one check of the event clones the repository, a failed clone is not tried again
+        self._use_repository_mirror: bool = False
+        self._repository_mirror_dir: str = ""
+        self._repository_mirror_failed: bool = False
+        self._repository_mirror_lock = threading.Lock()
 
         self.config = Config()
         self.log_prefix = self.prepare_log_prefix()
@@ -151,45 +383,7 @@ class ProcessGithubWehook:
         self.clone_repo_dir: str = os.path.join("/tmp", f"{self.repository.name}")
         self.add_api_users_to_auto_verified_and_merged_users()
 
-        self.supported_user_labels_str: str = "".join([f" * {label}\n" for label in USER_LABELS_DICT.keys()])
         self.current_pull_request_supported_retest = self._current_pull_request_supported_retest
-        self.welcome_msg: str = f"""
-Report bugs in [Issues](https://github.com/myakove/github-webhook-server/issues)
-
-The following are automatically added:
- * Add reviewers from OWNER file (in the root of the repository) under reviewers section.
- * Set PR size label.
- * New issue is created for the PR. (Closed when PR is merged/closed)
- * Run [pre-commit](https://pre-commit.ci/) if `.pre-commit-config.yaml` exists in the repo.
-
-Available user actions:
- * To mark PR as WIP comment `/wip` to the PR, To remove it from the PR comment `/wip cancel` to the PR.
- * To block merging of PR comment `/hold`, To un-block merging of PR comment `/hold cancel`.
- * To mark PR as verified comment `/verified` to the PR, to un-verify comment `/verified cancel` to the PR.
-        verified label removed on each new commit push.
- * To cherry pick a merged PR comment `/cherry-pick <target branch to cherry-pick to>` in the PR.
-    * Multiple target branches can be cherry-picked, separated by spaces. (`/cherry-pick branch1 branch2`)
-    * Cherry-pick will be started when PR is merged
- * To build and push container image command `/build-and-push-container` in the PR (tag will be the PR number).
-    * You can add extra args to the Podman build command
-        * Example: `/build-and-push-container --build-arg OPENSHIFT_PYTHON_WRAPPER_COMMIT=<commit_hash>`
- * To add a label by comment use `/<label name>`, to remove, use `/<label name> cancel`
- * To assign reviewers based on OWNERS file use `/assign-reviewers`
- * To check if PR can be merged use `/check-can-merge`
- * to assign reviewer to PR use `/assign-reviewer @<reviewer>`
-
-<details>
-<summary>Supported /retest check runs</summary>
-
-{self.prepare_retest_wellcome_msg}
-</details>
-
-<details>
-<summary>Supported labels</summary>
-
-{self.supported_user_labels_str}
-</details>
-    """
 
     def process(self) -> None:
         if self.github_event == "ping":
@@ -201,12 +395,19 @@ Available user actions:
             self.pull_request = self._get_pull_request()
             self.log_prefix = self.prepare_log_prefix(pull_request=self.pull_request)
             self.logger.debug(f"{self.log_prefix} {event_log}")
-            self.last_commit = self._get_last_commit()
             self.parent_committer = self.pull_request.user.login
-            self.last_committer = getattr(self.last_commit.committer, "login", self.parent_committer)
-            self.changed_files = self.list_changed_files()
             self.pull_request_branch = self.pull_request.base.ref
-            self.all_approvers_and_reviewers = self.get_all_approvers_and_reviewers()
+
+            # Independent GitHub API round-trips, fetch them concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                last_commit_future = executor.submit(self._get_last_commit)
+                changed_files_future = executor.submit(self.list_changed_files)
+                all_approvers_and_reviewers_future = executor.submit(self.get_all_approvers_and_reviewers)
+
+            self.last_commit = last_commit_future.result()
+            self.last_committer = getattr(self.last_commit.committer, "login", self.parent_committer)
+            self.changed_files = changed_files_future.result()
+            self.all_approvers_and_reviewers = all_approvers_and_reviewers_future.result()
             self.all_approvers = self.get_all_approvers()
             self.all_reviewers = self.get_all_reviewers()
 
@@ -234,6 +435,15 @@ Available user actions:
             elif self.github_event == "check_run":
                 self.process_pull_request_check_run_webhook_data()
 
+        finally:
+            if self._repository_mirror_dir:
+                shutil.rmtree(self._repository_mirror_dir, ignore_errors=True)
+
+    @functools.cached_property
+    def welcome_msg(self) -> str:
+        # Only needed for new pull requests and for recognizing the welcome comment
+        return WELCOME_MSG_TEMPLATE.format(retest_msg=self.prepare_retest_wellcome_msg)
+
     @property
     def prepare_retest_wellcome_msg(self) -> str:
         retest_msg: str = ""
@@ -256,7 +466,7 @@ Available user actions:
 
     def add_api_users_to_auto_verified_and_merged_users(self) -> None:
         apis_and_tokens = get_apis_and_tokes_from_config(config=self.config, repository_name=self.repository_name)
-        self.auto_verified_and_merged_users.extend([_api[0].get_user().login for _api in apis_and_tokens])
+        self.auto_verified_and_merged_users.extend([get_api_user_login(token=_token) for _, _token in apis_and_tokens])
 
     def _get_reposiroty_color_for_log_prefix(self) -> str:
         def _get_random_color(_colors: List[str], _json: Dict[str, str]) -> str:
@@ -268,38 +478,37 @@ Available user actions:
 
             return self.repository_name
 
-        _all_colors: List[str] = []
         color_json: Dict[str, str]
-        _colors_to_exclude = ("blue", "white", "black", "grey")
         color_file: str = os.path.join(self.config.data_dir, "log-colors.json")
 
-        for _color_name in cs.colors.values():
-            _cname = _color_name["name"]
-            if _cname.lower() in _colors_to_exclude:
-                continue
-
-            _all_colors.append(_cname)
+        with ProcessGithubWehook._log_colors_lock:
+            if ProcessGithubWehook._log_colors is None:
+                try:
+                    with open(color_file) as fd:
+                        ProcessGithubWehook._log_colors = json.load(fd)
 
-        try:
-            with open(color_file) as fd:
-                color_json = json.load(fd)
+                except Exception:
+                    ProcessGithubWehook._log_colors = {}
 
-        except Exception:
-            color_json = {}
+            color_json = ProcessGithubWehook._log_colors
+            if color := color_json.get(self.repository_name, ""):
+                _cs_object = cs(self.repository_name, color)
+                if cs.find_color(_cs_object):
+                    _str_color = _cs_object.render()
 
-        if color := color_json.get(self.repository_name, ""):
-            _cs_object = cs(self.repository_name, color)
-            if cs.find_color(_cs_object):
-                _str_color = _cs_object.render()
+                else:
+                    _str_color = _get_random_color(_colors=_LOG_PREFIX_COLORS, _json=color_json)
 
             else:
-                _str_color = _get_random_color(_colors=_all_colors, _json=color_json)
+                _str_color = _get_random_color(_colors=_LOG_PREFIX_COLORS, _json=color_json)
 
-        else:
-            _str_color = _get_random_color(_colors=_all_colors, _json=color_json)
+            # Only write when a color was (re)assigned, replace the file atomically so readers never see partial JSON
+            if color_json[self.repository_name] != color:
+                fd_num, tmp_color_file = tempfile.mkstemp(dir=self.config.data_dir, suffix=".tmp")
+                with os.fdopen(fd_num, "w") as fd:
+                    json.dump(color_json, fd)
 
-        with open(color_file, "w") as fd:
-            json.dump(color_json, fd)
+                os.replace(tmp_color_file, color_file)
 
         if _str_color:
             _str_color = _str_color.replace("\x1b", "\033")
@@ -307,8 +516,13 @@ Available user actions:
 
         return self.repository_name
 
+    @functools.cached_property
+    def _repository_log_color(self) -> str:
+        # The log prefix is prepared again once the pull request is known, the repository color does not change
+        return self._get_reposiroty_color_for_log_prefix()
+
     def prepare_log_prefix(self, pull_request: PullRequest | None = None) -> str:
-        _repository_color = self._get_reposiroty_color_for_log_prefix()
+        _repository_color = self._repository_log_color
         return (
             f"{_repository_color}[{self.github_event}][{self.x_github_delivery}][PR {pull_request.number}]:"
             if pull_request
@@ -342,10 +556,12 @@ Available user actions:
         self.logger.debug(
             f"{self.log_prefix} No pull request found in hook data, searching for pull request by head sha"
         )
-        for _pull_request in self.repository.get_pulls(state="open"):
-            if _pull_request.head.sha == check_run_head_sha:
+        # Ask GitHub for the pull requests of the head commit instead of paging through all open pull requests
+        head_commit: Commit = self.repository.get_commit(sha=check_run_head_sha)
+        for _pull_request in head_commit.get_pulls():
+            if _pull_request.state == "open" and _pull_request.head.sha == check_run_head_sha:
                 self.pull_request = _pull_request
-                self.last_commit = self._get_last_commit()
+                self.last_commit = head_commit
                 return self.check_if_can_be_merged()
 
         self.logger.error(f"{self.log_prefix} No pull request found")
@@ -416,11 +632,14 @@ Available user actions:
                     f"Project: {self.jira_project}, Token: {self.jira_token}"
                 )
 
-        self.auto_verified_and_merged_users: List[str] = get_value_from_dicts(
-            primary_dict=repo_data,
-            secondary_dict=config_data,
-            key="auto-verified-and-merged-users",
-            return_on_none=[],
+        # Own copy, the api users are added to it and the config data is shared
+        self.auto_verified_and_merged_users: List[str] = list(
+            get_value_from_dicts(
+                primary_dict=repo_data,
+                secondary_dict=config_data,
+                key="auto-verified-and-merged-users",
+                return_on_none=[],
+            )
         )
         self.can_be_merged_required_labels = get_value_from_dicts(
             primary_dict=repo_data,
@@ -436,7 +655,16 @@ Available user actions:
         if number:
             return self.repository.get_pull(number)
 
+        # The payload carries the pull request number in a known place, only scan the whole payload when it does not
+        if _tried_number := self._pull_request_number_from_hook_data():
+            with contextlib.suppress(GithubException):
+                return self.repository.get_pull(_tried_number)
+
         for _number in extract_key_from_dict(key="number", _dict=self.hook_data):
+            # Already failed above, do not ask GitHub again
+            if _number == _tried_number:
+                continue
+
             try:
                 return self.repository.get_pull(_number)
             except GithubException:
@@ -450,14 +678,90 @@ Available user actions:
 
         raise NoPullRequestError(f"{self.log_prefix} No issue or pull_request found in hook data")
 
+    def _pull_request_number_from_hook_data(self) -> Optional[int]:
+        if _pull_request := self.hook_data.get("pull_request"):
+            return _pull_request.get("number")
+
+        # Issue comments on a pull request carry a pull_request key in the issue payload
+        _issue: Dict[str, Any] = self.hook_data.get("issue") or {}
+        if _issue.get("pull_request"):
+            return _issue.get("number")
+
+        if _number := self.hook_data.get("number"):
+            return _number
+
+        _check_run_pull_requests: List[Dict[str, Any]] = (self.hook_data.get("check_run") or {}).get(
+            "pull_requests"
+        ) or []
+        if _check_run_pull_requests:
+            return _check_run_pull_requests[0].get("number")
+
+        return None
+
     def _get_last_commit(self) -> Commit:
-        return list(self.pull_request.get_commits())[-1]
+        # The pull request head is its last commit, fetch it directly instead of paging through all commits
+        return self.repository.get_commit(sha=self.pull_request.head.sha)
 
-    def label_exists_in_pull_request(self, label: str) -> bool:
-        return any(lb for lb in self.pull_request_labels_names() if lb == label)
+    def label_exists_in_pull_request(self, label: str, refresh: bool = False) -> bool:
+        if not self.pull_request:
+            return False
+
+        return label in self.pull_request_labels_names(refresh=refresh)
+
+    def pull_request_labels_names(self, refresh: bool = False) -> List[str]:
+        if not self.pull_request:
+            return []
+
+        # pull_request.labels is a snapshot from when the pull request was fetched and is never updated.
+        # Keep our own view, updated by _add_label/_remove_label, and only re-read labels from GitHub on refresh
+        if refresh:
+            self._refresh_pull_request_labels()
+
+        with self._pull_request_labels_lock:
+            return list(self._pull_request_labels_set())
+
+    def _pull_request_labels_set(self) -> Set[str]:
+        # Called with _pull_request_labels_lock held
+        if self.pull_request.number not in self._pull_request_labels:
+            self._pull_request_labels[self.pull_request.number] = {lb.name for lb in self.pull_request.labels}
+
+        return self._pull_request_labels[self.pull_request.number]
+
+    def _refresh_pull_request_labels(self) -> Set[str]:
+        """
+        Re-read the pull request labels from GitHub and return them as listed by GitHub.
+
+        The cached labels keep the changes made by this event that the listing does not show yet, so a refresh
+        never drops a label another thread has just added (or brings back one it has just removed).
+        """
+        github_labels: Set[str] = {lb.name for lb in self.pull_request.get_labels()}
+        with self._pull_request_labels_lock:
+            labels = set(github_labels)
+            labels_changes = self._pull_request_labels_changes.get(self.pull_request.number, {})
+            for _label, _exists in list(labels_changes.items()):
+                if (_label in github_labels) == _exists:
+                    del labels_changes[_label]
 
-    def pull_request_labels_names(self) -> List[str]:
-        return [lb.name for lb in self.pull_request.labels] if self.pull_request else []
+                elif _exists:
+                    labels.add(_label)
+
+                else:
+                    labels.discard(_label)
+
+            self._pull_request_labels[self.pull_request.number] = labels
+
+        return github_labels
+
+    def _set_pull_request_label_cache(self, label: str, exists: bool) -> None:
+        with self._pull_request_labels_lock:
+            labels = self._pull_request_labels_set()
+            if exists:
+                labels.add(label)
+
+            else:
+                labels.discard(label)
+
+            self._pull_request_labels_changes.setdefault(self.pull_request.number, {})[label] = exists
 
     def skip_if_pull_request_already_merged(self) -> bool:
         if self.pull_request and self.pull_request.is_merged():
@@ -471,6 +775,7 @@ Available user actions:
             if self.label_exists_in_pull_request(label=label):
                 self.logger.info(f"{self.log_prefix} Removing label {label}")
                 self.pull_request.remove_from_labels(label)
+                self._set_pull_request_label_cache(label=label, exists=False)
                 return self.wait_for_label(label=label, exists=False)
         except Exception as exp:
             self.logger.debug(f"{self.log_prefix} Failed to remove {label} label. Exception: {exp}")
@@ -492,40 +797,77 @@ Available user actions:
         if label in STATIC_LABELS_DICT:
             self.logger.info(f"{self.log_prefix} Adding pull request label {label}")
             self.pull_request.add_to_labels(label)
+            self._set_pull_request_label_cache(label=label, exists=True)
             return
 
-        _color = [DYNAMIC_LABELS_DICT[_label] for _label in DYNAMIC_LABELS_DICT if _label in label]
+        _color = next((_color for _label, _color in DYNAMIC_LABELS_DICT.items() if _label in label), None)
         self.logger.debug(f"{self.log_prefix} Label {label} was {'found' if _color else 'not found'} in labels dict")
-        color = _color[0] if _color else "D4C5F9"
+        color = _color or "D4C5F9"
         _with_color_msg = f"repository label {label} with color {color}"
 
-        try:
-            _repo_label = self.repository.get_label(label)
-            _repo_label.edit(name=_repo_label.name, color=color)
-            self.logger.debug(f"{self.log_prefix} Edit {_with_color_msg}")
+        repository_labels_colors = self._repository_labels_colors()
+        _repo_label_color = repository_labels_colors.get(label)
+        if _repo_label_color is None:
+            try:
+                self.logger.debug(f"{self.log_prefix} Add {_with_color_msg}")
+                self.repository.create_label(name=label, color=color)
 
-        except UnknownObjectException:
-            self.logger.debug(f"{self.log_prefix} Add {_with_color_msg}")
-            self.repository.create_label(name=label, color=color)
+            except GithubException:
+                # Created since the labels were fetched, make sure it has the expected color
+                self._invalidate_repository_labels_colors()
+                _repo_label_color = ""
+
+        if _repo_label_color is not None and _repo_label_color.lower() != color.lower():
+            try:
+                _repo_label = self.repository.get_label(label)
+                _repo_label.edit(name=_repo_label.name, color=color)
+                self.logger.debug(f"{self.log_prefix} Edit {_with_color_msg}")
+
+            except UnknownObjectException:
+                # Deleted since the labels were fetched
+                self._invalidate_repository_labels_colors()
+                self.logger.debug(f"{self.log_prefix} Add {_with_color_msg}")
+                self.repository.create_label(name=label, color=color)
+
+        repository_labels_colors[label] = color
 
         self.logger.info(f"{self.log_prefix} Adding pull request label {label}")
         self.pull_request.add_to_labels(label)
+        self._set_pull_request_label_cache(label=label, exists=True)
         self.wait_for_label(label=label, exists=True)
 
+    def _repository_labels_colors(self) -> Dict[str, str]:
+        with _REPOSITORY_LABELS_COLORS_LOCK:
+            _cached = _REPOSITORY_LABELS_COLORS.get(self.repository_full_name)
+
+        if _cached and time.monotonic() - _cached[0] < REPOSITORY_LABELS_COLORS_TTL:
+            return _cached[1]
+
+        _labels_colors = {_label.name: _label.color for _label in self.repository.get_labels()}
+        with _REPOSITORY_LABELS_COLORS_LOCK:
+            _REPOSITORY_LABELS_COLORS[self.repository_full_name] = (time.monotonic(), _labels_colors)
+
+        return _labels_colors
+
+    def _invalidate_repository_labels_colors(self) -> None:
+        with _REPOSITORY_LABELS_COLORS_LOCK:
+            _REPOSITORY_LABELS_COLORS.pop(self.repository_full_name, None)
+
     def wait_for_label(self, label: str, exists: bool) -> bool:
-        try:
-            for sample in TimeoutSampler(
-                wait_timeout=30,
-                sleep=5,
-                func=self.label_exists_in_pull_request,
-                label=label,
-            ):
-                if sample == exists:
-                    return True
+        # GitHub usually reflects a label change right away, back off exponentially instead of a fixed long sleep
+        sleep: int = 1
+        deadline: float = time.monotonic() + 30
+        while True:
+            if (label in self._refresh_pull_request_labels()) == exists:
+                return True
+
+            if time.monotonic() + sleep > deadline:
+                break
 
-        except TimeoutExpiredError:
-            self.logger.debug(f"{self.log_prefix} Label {label} {'not found' if exists else 'found'}")
+            time.sleep(sleep)
+            sleep = min(sleep * 2, 8)
 
+        self.logger.debug(f"{self.log_prefix} Label {label} {'not found' if exists else 'found'}")
         return False
 
     def _generate_issue_title(self) -> str:
@@ -605,33 +947,38 @@ stderr: `{_err}`
     def assign_reviewers(self) -> None:
         self.logger.info(f"{self.log_prefix} Assign reviewers")
 
-        _to_add: List[str] = list(set(self.all_reviewers))
-        self.logger.debug(f"{self.log_prefix} Reviewers to add: {', '.join(_to_add)}")
+        _to_add: Set[str] = set(self.all_reviewers)
+        _to_add.discard(self.pull_request.user.login)
 
-        for reviewer in _to_add:
-            if reviewer != self.pull_request.user.login:
-                self.logger.debug(f"{self.log_prefix} Adding reviewer {reviewer}")
-                try:
-                    self.pull_request.create_review_request([reviewer])
-                except GithubException as ex:
-                    self.logger.debug(f"{self.log_prefix} Failed to add reviewer {reviewer}. {ex}")
-                    self.pull_request.create_issue_comment(f"{reviewer} can not be added as reviewer. {ex}")
+        # Each review request is an API call, skip reviewers that are already requested
+        requested_users, _ = self.pull_request.get_review_requests()
+        _to_add.difference_update(_user.login for _user in requested_users)
+        if not _to_add:
+            self.logger.debug(f"{self.log_prefix} All reviewers already requested")
+            return
+
+        reviewers: List[str] = sorted(_to_add)
+        self.logger.debug(f"{self.log_prefix} Reviewers to add: {', '.join(reviewers)}")
+        try:
+            self.pull_request.create_review_request(reviewers)
+            return
+        except GithubException as ex:
+            # The whole request fails if any reviewer can not be added, retry one by one to add the valid ones
+            self.logger.debug(f"{self.log_prefix} Failed to add reviewers {reviewers}, adding one by one. {ex}")
+
+        for reviewer in reviewers:
+            self.logger.debug(f"{self.log_prefix} Adding reviewer {reviewer}")
+            try:
+                self.pull_request.create_review_request([reviewer])
+            except GithubException as ex:
+                self.logger.debug(f"{self.log_prefix} Failed to add reviewer {reviewer}. {ex}")
+                self.pull_request.create_issue_comment(f"{reviewer} can not be added as reviewer. {ex}")
 
     def get_size(self) -> str:
         """Calculates size label based on additions and deletions."""
 
         size = self.pull_request.additions + self.pull_request.deletions
-
-        # Define label thresholds in a more readable way
-        threshold_sizes = [20, 50, 100, 300, 500]
-        prefixes = ["XS", "S", "M", "L", "XL"]
-
-        for i, size_threshold in enumerate(threshold_sizes):
-            if size < size_threshold:
-                _label = prefixes[i]
-                return f"{SIZE_LABEL_PREFIX}{_label}"
-
-        return f"{SIZE_LABEL_PREFIX}XXL"
+        return f"{SIZE_LABEL_PREFIX}{SIZE_LABELS[bisect.bisect_right(SIZE_THRESHOLDS, size)]}"
 
     def add_size_label(self) -> None:
         """Add a size label to the pull request based on its additions and deletions."""
@@ -640,13 +987,14 @@ stderr: `{_err}`
             self.logger.debug(f"{self.log_prefix} Size label not found")
             return
 
-        if size_label in self.pull_request_labels_names():
+        pull_request_labels = self.pull_request_labels_names()
+        if size_label in pull_request_labels:
             return
 
-        exists_size_label = [label for label in self.pull_request_labels_names() if label.startswith(SIZE_LABEL_PREFIX)]
-
-        if exists_size_label:
-            self._remove_label(label=exists_size_label[0])
+        if exists_size_label := next(
+            (label for label in pull_request_labels if label.startswith(SIZE_LABEL_PREFIX)), None
+        ):
+            self._remove_label(label=exists_size_label)
 
         self._add_label(label=size_label)
 
@@ -784,8 +1132,14 @@ stderr: `{_err}`
         )
 
     def close_issue_for_merged_or_closed_pr(self, hook_action: str) -> None:
-        for issue in self.repository.get_issues():
-            if issue.body == self._generate_issue_body():
+        issue_body: str = self._generate_issue_body()
+        # Let GitHub search for the pull request number marker of the issue body instead of listing all the open
+        # issues, the assignee is not used, GitHub drops it for users without access (e.g. fork contributors)
+        query: str = (
+            f'"Number: [#{self.pull_request.number}]" in:body is:issue is:open repo:{self.repository_full_name}'
+        )
+        for issue in self.github_api.search_issues(query=query):
+            if issue.body == issue_body:
                 self.logger.info(f"{self.log_prefix} Closing issue {issue.title} for PR: {self.pull_request.title}")
                 issue.create_comment(
                     f"{self.log_prefix} Closing issue for PR: {self.pull_request.title}.\nPR was {hook_action}."
@@ -803,11 +1157,11 @@ stderr: `{_err}`
             return
 
         pr_tag = repository_full_tag.split(":")[-1]
-        registry_info = self.container_repository.split("/")
-        registry_url = "" if len(registry_info) < 3 else registry_info[0]
-
-        reg_login_cmd = f"regctl registry login {registry_url} -u {self.container_repository_username} -p {self.container_repository_password}"
-        rc, out, err = self.run_podman_command(command=reg_login_cmd)
+        # The password is passed on stdin so it never shows in the process list or in the logged command
+        reg_login_cmd = (
+            f"regctl registry login {self._container_registry_url} -u {self.container_repository_username} --pass-stdin"
+        )
+        rc, out, err = self.run_podman_command(command=reg_login_cmd, input=self.container_repository_password)
 
         if rc:
             tag_ls_cmd = f"regctl tag ls {self.container_repository} --include {pr_tag}"
@@ -834,7 +1188,8 @@ stderr: `{_err}`
             self.logger.error(f"{self.log_prefix} Failed to delete tag: {repository_full_tag}. OUT:{out}. ERR:{err}")
 
     def process_comment_webhook_data(self) -> None:
-        if comment_action := self.hook_data["action"] in ("edited", "deleted"):
+        comment_action: str = self.hook_data["action"]
+        if comment_action in ("edited", "deleted"):
             self.logger.debug(f"{self.log_prefix} Not processing comment. action is {comment_action}")
             return
 
@@ -842,21 +1197,24 @@ stderr: `{_err}`
 
         body: str = self.hook_data["comment"]["body"]
 
+        # Commands start with '/', most comments have none
+        if "/" not in body:
+            self.logger.debug(f"{self.log_prefix} No commands found in comment. Not processing")
+            return
+
         if body == self.welcome_msg:
             self.logger.debug(
                 f"{self.log_prefix} Welcome message found in issue {self.pull_request.title}. Not processing"
             )
             return
 
-        _user_commands: List[str] = [_cmd.strip("/") for _cmd in body.strip().splitlines() if _cmd.startswith("/")]
+        _user_commands: List[str] = USER_COMMAND_RE.findall(body.strip())
 
         user_login: str = self.hook_data["sender"]["login"]
+        issue_comment_id: int = self.hook_data["comment"]["id"]
+
         for user_command in _user_commands:
-            self.user_commands(
-                command=user_command,
-                reviewed_user=user_login,
-                issue_comment_id=self.hook_data["comment"]["id"],
-            )
+            self.user_commands(command=user_command, reviewed_user=user_login, issue_comment_id=issue_comment_id)
 
     def process_pull_request_webhook_data(self) -> None:
         hook_action: str = self.hook_data["action"]
@@ -892,9 +1250,14 @@ stderr: `{_err}`
                     self.logger.error(f"{self.log_prefix} {_exp}")
 
         if hook_action == "synchronize":
+            # Sets the whole labels list, run it before anything else adds labels to the pull request
+            try:
+                self.remove_labels_when_pull_request_sync()
+            except Exception as exp:
+                self.logger.error(f"{self.log_prefix} {exp}")
+
             pull_request_synchronize_futures: List[Future] = []
             with ThreadPoolExecutor() as executor:
-                pull_request_synchronize_futures.append(executor.submit(self.remove_labels_when_pull_request_sync))
                 pull_request_synchronize_futures.append(
                     executor.submit(self.process_opened_or_synchronize_pull_request)
                 )
@@ -907,29 +1270,49 @@ stderr: `{_err}`
                     self.logger.error(f"{self.log_prefix} {_exp}")
 
         if hook_action == "closed":
-            self.close_issue_for_merged_or_closed_pr(hook_action=hook_action)
-            self.delete_remote_tag_for_merged_or_closed_pr()
-            if is_merged := pull_request_data.get("merged", False):
-                self.logger.info(f"{self.log_prefix} PR is merged")
-
-                for _label in self.pull_request.labels:
-                    _label_name = _label.name
-                    if _label_name.startswith(CHERRY_PICK_LABEL_PREFIX):
-                        self.cherry_pick(target_branch=_label_name.replace(CHERRY_PICK_LABEL_PREFIX, ""))
-
-                self._run_build_container(
-                    push=True,
-                    set_check=False,
-                    is_merged=is_merged,
+            is_merged: bool = pull_request_data.get("merged", False)
+            pull_request_closed_futures: List[Future] = []
+            with ThreadPoolExecutor() as executor:
+                pull_request_closed_futures.append(
+                    executor.submit(self.close_issue_for_merged_or_closed_pr, **{"hook_action": hook_action})
                 )
+                pull_request_closed_futures.append(executor.submit(self.delete_remote_tag_for_merged_or_closed_pr))
+                if self.jira_track_pr:
+                    pull_request_closed_futures.append(
+                        executor.submit(self.close_jira_when_pull_request_closed, **{"is_merged": is_merged})
+                    )
 
-                # label_by_pull_requests_merge_state_after_merged will override self.pull_request
-                original_pull_request = self.pull_request
-                self.label_all_opened_pull_requests_merge_state_after_merged()
-                self.pull_request = original_pull_request
+                if is_merged:
+                    self.logger.info(f"{self.log_prefix} PR is merged")
 
-            if self.jira_track_pr:
-                self.close_jira_when_pull_request_closed(is_merged=is_merged)
+                    _labels = self.pull_request_labels_names()
+                    for _target_branch in self._classify_labels(labels=_labels)["cherry_pick_targets"]:
+                        pull_request_closed_futures.append(
+                            executor.submit(self.cherry_pick, **{"target_branch": _target_branch})
+                        )
+
+                    pull_request_closed_futures.append(
+                        executor.submit(
+                            self._run_build_container,
+                            **{"push": True, "set_check": False, "is_merged": is_merged},
+                        )
+                    )
+
+            for result in as_completed(pull_request_closed_futures):
+                if _exp := result.exception():
+                    self.logger.error(f"{self.log_prefix} {_exp}")
+
+            if is_merged:
+                # GitHub needs some time to recompute the mergeable state of the other pull requests
+                self.logger.info(
+                    f"{self.log_prefix} Check opened pull requests merge state in {MERGE_STATE_RELABEL_DELAY} seconds"
+                )
+                schedule_merge_state_relabel(
+                    github_api=self.github_api,
+                    repository_full_name=self.repository_full_name,
+                    logger=self.logger,
+                    log_prefix=self.log_prefix,
+                )
 
         if hook_action in ("labeled", "unlabeled"):
             _check_for_merge: bool = False
@@ -940,11 +1323,11 @@ stderr: `{_err}`
                 return
 
             self.logger.info(f"{self.log_prefix} PR {self.pull_request.number} {hook_action} with {labeled}")
-            if labeled.startswith(APPROVED_BY_LABEL_PREFIX):
-                _reviewer = labeled.split(APPROVED_BY_LABEL_PREFIX)[-1]
+            if labeled.startswith(_APPROVED_BY_LABEL_PREFIX_LOWER):
+                _reviewer = labeled[len(_APPROVED_BY_LABEL_PREFIX_LOWER) :]
 
-            if labeled.startswith(CHANGED_REQUESTED_BY_LABEL_PREFIX):
-                _reviewer = labeled.split(CHANGED_REQUESTED_BY_LABEL_PREFIX)[-1]
+            elif labeled.startswith(_CHANGED_REQUESTED_BY_LABEL_PREFIX_LOWER):
+                _reviewer = labeled[len(_CHANGED_REQUESTED_BY_LABEL_PREFIX_LOWER) :]
 
             _approved_output: Dict[str, Any] = {"title": "Approved", "summary": "", "text": ""}
             if _reviewer in self.all_approvers:
@@ -962,10 +1345,10 @@ stderr: `{_err}`
                 self.check_if_can_be_merged()
 
     def process_push_webhook_data(self) -> None:
-        tag = re.search(r"refs/tags/?(.*)", self.hook_data["ref"])
-        if tag:
-            tag_name = tag.group(1)
-            self.logger.info(f"{self.log_prefix} Processing push for tag: {tag.group(1)}")
+        ref: str = self.hook_data["ref"]
+        if ref.startswith("refs/tags/"):
+            tag_name = ref[len("refs/tags/") :]
+            self.logger.info(f"{self.log_prefix} Processing push for tag: {tag_name}")
             if self.pypi:
                 self.logger.info(f"{self.log_prefix} Processing upload to pypi for tag: {tag_name}")
                 self.upload_to_pypi(tag_name=tag_name)
@@ -1059,7 +1442,9 @@ stderr: `{_err}`
 
         self.set_run_tox_check_in_progress()
         with self._prepare_cloned_repo_dir(clone_repo_dir=clone_repo_dir):
-            rc, out, err = run_command(command=cmd, log_prefix=self.log_prefix)
+            rc, out, err = run_command(
+                command=cmd, log_prefix=self.log_prefix, output_max_size=CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE
+            )
 
             output: Dict[str, Any] = {
                 "title": "Tox",
@@ -1083,7 +1468,9 @@ stderr: `{_err}`
         cmd = f" uvx --directory {clone_repo_dir} {PRE_COMMIT_STR} run --all-files"
         self.set_run_pre_commit_check_in_progress()
         with self._prepare_cloned_repo_dir(clone_repo_dir=clone_repo_dir):
-            rc, out, err = run_command(command=cmd, log_prefix=self.log_prefix)
+            rc, out, err = run_command(
+                command=cmd, log_prefix=self.log_prefix, output_max_size=CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE
+            )
 
             output: Dict[str, Any] = {
                 "title": "Pre-Commit",
@@ -1098,15 +1485,6 @@ stderr: `{_err}`
     def user_commands(self, command: str, reviewed_user: str, issue_comment_id: int) -> None:
         self.create_comment_reaction(issue_comment_id=issue_comment_id, reaction=REACTIONS.ok)
 
-        available_commands: List[str] = [
-            COMMAND_RETEST_STR,
-            COMMAND_CHERRY_PICK_STR,
-            COMMAND_ASSIGN_REVIEWERS_STR,
-            COMMAND_CHECK_CAN_MERGE_STR,
-            BUILD_AND_PUSH_CONTAINER_STR,
-            COMMAND_ASSIGN_REVIEWER_STR,
-        ]
-
         command_and_args: List[str] = command.split(" ", 1)
         _command = command_and_args[0]
         _args: str = command_and_args[1] if len(command_and_args) > 1 else ""
@@ -1114,7 +1492,7 @@ stderr: `{_err}`
         self.logger.debug(
             f"{self.log_prefix} User: {reviewed_user}, Command: {_command}, Command args: {_args if _args else 'None'}"
         )
-        if _command not in available_commands + list(USER_LABELS_DICT.keys()):
+        if _command not in SUPPORTED_USER_COMMANDS:
             self.logger.debug(f"{self.log_prefix} Command {command} is not supported.")
             return
 
@@ -1130,69 +1508,105 @@ stderr: `{_err}`
             self.pull_request.create_issue_comment(missing_command_arg_comment_msg)
             return
 
-        if _command == COMMAND_ASSIGN_REVIEWER_STR:
-            self._add_reviewer_by_user_comment(reviewer=_args)
+        if handler := self._user_command_handlers.get(_command):
+            handler(command_args=_args, remove=remove, reviewed_user=reviewed_user, issue_comment_id=issue_comment_id)
 
-        elif _command == COMMAND_ASSIGN_REVIEWERS_STR:
-            self.assign_reviewers()
+        else:
+            self.label_by_user_comment(
+                user_requested_label=_command,
+                remove=remove,
+                reviewed_user=reviewed_user,
+                issue_comment_id=issue_comment_id,
+            )
 
-        elif _command == COMMAND_CHECK_CAN_MERGE_STR:
-            self.check_if_can_be_merged()
+    @functools.cached_property
+    def _user_command_handlers(self) -> Dict[str, Callable[..., None]]:
+        # All the handlers take the same keyword arguments: command_args, remove, reviewed_user and issue_comment_id
+        return {
+            COMMAND_ASSIGN_REVIEWER_STR: self._handle_assign_reviewer_command,
+            COMMAND_ASSIGN_REVIEWERS_STR: self._handle_assign_reviewers_command,
+            COMMAND_CHECK_CAN_MERGE_STR: self._handle_check_can_merge_command,
+            COMMAND_CHERRY_PICK_STR: self._handle_cherry_pick_command,
+            COMMAND_RETEST_STR: self._handle_retest_command,
+            BUILD_AND_PUSH_CONTAINER_STR: self._handle_build_and_push_container_command,
+            WIP_STR: self._handle_wip_command,
+            HOLD_LABEL_STR: self._handle_hold_command,
+            VERIFIED_LABEL_STR: self._handle_verified_command,
+        }
 
-        elif _command == COMMAND_CHERRY_PICK_STR:
-            self.process_cherry_pick_command(
-                issue_comment_id=issue_comment_id, command_args=_args, reviewed_user=reviewed_user
-            )
+    def _handle_assign_reviewer_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        self._add_reviewer_by_user_comment(reviewer=command_args)
 
-        elif _command == COMMAND_RETEST_STR:
-            self.process_retest_command(issue_comment_id=issue_comment_id, command_args=_args)
+    def _handle_assign_reviewers_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        self.assign_reviewers()
 
-        elif _command == BUILD_AND_PUSH_CONTAINER_STR:
-            if self.build_and_push_container:
-                self._run_build_container(push=True, set_check=False, command_args=_args)
-            else:
-                msg = f"No {BUILD_AND_PUSH_CONTAINER_STR} configured for this repository"
-                error_msg = f"{self.log_prefix} {msg}"
-                self.logger.debug(error_msg)
-                self.pull_request.create_issue_comment(msg)
+    def _handle_check_can_merge_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        self.check_if_can_be_merged()
 
-        elif _command == WIP_STR:
-            wip_for_title: str = f"{WIP_STR.upper()}:"
-            if remove:
-                self._remove_label(label=WIP_STR)
-                self.pull_request.edit(title=self.pull_request.title.replace(wip_for_title, ""))
-            else:
-                self._add_label(label=WIP_STR)
-                self.pull_request.edit(title=f"{wip_for_title} {self.pull_request.title}")
+    def _handle_cherry_pick_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        self.process_cherry_pick_command(
+            issue_comment_id=issue_comment_id, command_args=command_args, reviewed_user=reviewed_user
+        )
 
-        elif _command == HOLD_LABEL_STR:
-            if reviewed_user not in self.all_approvers:
-                self.pull_request.create_issue_comment(
-                    f"{reviewed_user} is not part of the approver, only approvers can mark pull request as hold"
-                )
-            else:
-                if remove:
-                    self._remove_label(label=HOLD_LABEL_STR)
-                else:
-                    self._add_label(label=HOLD_LABEL_STR)
+    def _handle_retest_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        self.process_retest_command(issue_comment_id=issue_comment_id, command_args=command_args)
 
-                self.check_if_can_be_merged()
+    def _handle_build_and_push_container_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        if self.build_and_push_container:
+            self._run_build_container(push=True, set_check=False, command_args=command_args)
+        else:
+            msg = f"No {BUILD_AND_PUSH_CONTAINER_STR} configured for this repository"
+            error_msg = f"{self.log_prefix} {msg}"
+            self.logger.debug(error_msg)
+            self.pull_request.create_issue_comment(msg)
 
-        elif _command == VERIFIED_LABEL_STR:
+    def _handle_wip_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        wip_for_title: str = f"{WIP_STR.upper()}:"
+        if remove:
+            self._remove_label(label=WIP_STR)
+            self.pull_request.edit(title=self.pull_request.title.replace(wip_for_title, ""))
+        else:
+            self._add_label(label=WIP_STR)
+            self.pull_request.edit(title=f"{wip_for_title} {self.pull_request.title}")
+
+    def _handle_hold_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        if reviewed_user not in self.all_approvers:
+            self.pull_request.create_issue_comment(
+                f"{reviewed_user} is not part of the approver, only approvers can mark pull request as hold"
+            )
+        else:
             if remove:
-                self._remove_label(label=VERIFIED_LABEL_STR)
-                self.set_verify_check_queued()
+                self._remove_label(label=HOLD_LABEL_STR)
             else:
-                self._add_label(label=VERIFIED_LABEL_STR)
-                self.set_verify_check_success()
+                self._add_label(label=HOLD_LABEL_STR)
+
+            self.check_if_can_be_merged()
 
+    def _handle_verified_command(
+        self, *, command_args: str, remove: bool, reviewed_user: str, issue_comment_id: int
+    ) -> None:
+        if remove:
+            self._remove_label(label=VERIFIED_LABEL_STR)
+            self.set_verify_check_queued()
         else:
-            self.label_by_user_comment(
-                user_requested_label=_command,
-                remove=remove,
-                reviewed_user=reviewed_user,
-                issue_comment_id=issue_comment_id,
-            )
+            self._add_label(label=VERIFIED_LABEL_STR)
+            self.set_verify_check_success()
 
     def cherry_pick(self, target_branch: str, reviewed_user: str = "") -> None:
         requested_by = reviewed_user or "by target-branch label"
@@ -1211,20 +1625,27 @@ stderr: `{_err}`
             pull_request_url = self.pull_request.html_url
             clone_repo_dir = f"{self.clone_repo_dir}-{uuid4()}"
             git_cmd = f"git --work-tree={clone_repo_dir} --git-dir={clone_repo_dir}/.git"
-            hub_cmd = f"GITHUB_TOKEN={self.token} hub --work-tree={clone_repo_dir} --git-dir={clone_repo_dir}/.git"
+            hub_cmd = f"hub --work-tree={clone_repo_dir} --git-dir={clone_repo_dir}/.git"
+            # hub reads the token from the environment, no need for a shell to set it
+            hub_env: Dict[str, str] = {**os.environ, "GITHUB_TOKEN": self.token}
             commands: List[str] = [
                 f"{git_cmd} checkout {target_branch}",
                 f"{git_cmd} pull origin {target_branch}",
                 f"{git_cmd} checkout -b {new_branch_name} origin/{target_branch}",
                 f"{git_cmd} cherry-pick {commit_hash}",
                 f"{git_cmd} push origin {new_branch_name}",
-                f"bash -c \"{hub_cmd} pull-request -b {target_branch} -h {new_branch_name} -l {CHERRY_PICKED_LABEL_PREFIX} -m '{CHERRY_PICKED_LABEL_PREFIX}: [{target_branch}] {commit_msg_striped}' -m 'cherry-pick {pull_request_url} into {target_branch}' -m 'requested-by {requested_by}'\"",
+                f"{hub_cmd} pull-request -b {target_branch} -h {new_branch_name} -l {CHERRY_PICKED_LABEL_PREFIX} -m '{CHERRY_PICKED_LABEL_PREFIX}: [{target_branch}] {commit_msg_striped}' -m 'cherry-pick {pull_request_url} into {target_branch}' -m 'requested-by {requested_by}'",
             ]
 
             rc, out, err = None, "", ""
             with self._prepare_cloned_repo_dir(clone_repo_dir=clone_repo_dir):
                 for cmd in commands:
-                    rc, out, err = run_command(command=cmd, log_prefix=self.log_prefix)
+                    rc, out, err = run_command(
+                        command=cmd,
+                        log_prefix=self.log_prefix,
+                        env=hub_env,
+                        output_max_size=CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE,
+                    )
                     if not rc:
                         output = {
                             "title": "Cherry-pick details",
@@ -1235,17 +1656,11 @@ stderr: `{_err}`
                         self.logger.error(f"{self.log_prefix} Cherry pick failed: {out} --- {err}")
                         local_branch_name = f"{self.pull_request.head.ref}-{target_branch}"
                         self.pull_request.create_issue_comment(
-                            f"**Manual cherry-pick is needed**\nCherry pick failed for "
-                            f"{commit_hash} to {target_branch}:\n"
-                            f"To cherry-pick run:\n"
-                            "```\n"
-                            f"git remote update\n"
-                            f"git checkout {target_branch}\n"
-                            f"git pull origin {target_branch}\n"
-                            f"git checkout -b {local_branch_name}\n"
-                            f"git cherry-pick {commit_hash}\n"
-                            f"git push origin {local_branch_name}\n"
-                            "```"
+                            CHERRY_PICK_MANUAL_MSG_TEMPLATE.format(
+                                commit_hash=commit_hash,
+                                target_branch=target_branch,
+                                local_branch_name=local_branch_name,
+                            )
                         )
                         return
 
@@ -1257,22 +1672,6 @@ stderr: `{_err}`
             self.set_cherry_pick_success(output=output)
             self.pull_request.create_issue_comment(f"Cherry-picked PR {self.pull_request.title} into {target_branch}")
 
-    def label_all_opened_pull_requests_merge_state_after_merged(self) -> None:
-        """
-        Labels pull requests based on their mergeable state.
-
-        If the mergeable state is 'behind', the 'needs rebase' label is added.
-        If the mergeable state is 'dirty', the 'has conflicts' label is added.
-        """
-        time_sleep = 30
-        self.logger.info(f"{self.log_prefix} Sleep for {time_sleep} seconds before getting all opened PRs")
-        time.sleep(time_sleep)
-
-        for pull_request in self.repository.get_pulls(state="open"):
-            self.pull_request = pull_request
-            self.logger.info(f"{self.log_prefix} check label pull request after merge")
-            self.label_pull_request_by_merge_state()
-
     def label_pull_request_by_merge_state(self) -> None:
         merge_state = self.pull_request.mergeable_state
         self.logger.debug(f"{self.log_prefix} Mergeable state is {merge_state}")
@@ -1314,36 +1713,50 @@ stderr: `{_err}`
 
         try:
             self.logger.info(f"{self.log_prefix} Check if {CAN_BE_MERGED_STR}.")
-            self.set_merge_check_queued()
-            last_commit_check_runs = list(self.last_commit.get_check_runs())
+            # Independent GitHub API round-trips, fetch them concurrently
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                merge_check_queued_future = executor.submit(self.set_merge_check_queued)
+                check_runs_future = executor.submit(lambda: list(self.last_commit.get_check_runs()))
+                required_status_checks_future = executor.submit(self.get_all_required_status_checks)
+                mergeable_future = executor.submit(lambda: self.pull_request.mergeable)
+
+            merge_check_queued_future.result()
+            last_commit_check_runs = check_runs_future.result()
+            self.all_required_status_checks = required_status_checks_future.result()
             _labels = self.pull_request_labels_names()
             self.logger.debug(f"{self.log_prefix} check if can be merged. PR labels are: {_labels}")
 
-            is_pr_mergable = self.pull_request.mergeable
+            is_pr_mergable = mergeable_future.result()
             if not is_pr_mergable:
                 failure_output += f"PR is not mergeable: {is_pr_mergable}\n"
 
-            required_check_in_progress_failure_output, check_runs_in_progress = self._required_check_in_progress(
+            check_runs_in_progress, failed_check_runs = self._required_check_runs_in_progress_and_failed(
                 last_commit_check_runs=last_commit_check_runs
             )
+            required_check_in_progress_failure_output = self._required_check_in_progress(
+                check_runs_in_progress=check_runs_in_progress
+            )
             if required_check_in_progress_failure_output:
                 failure_output += required_check_in_progress_failure_output
 
-            labels_failure_output = self._wip_or_hold_lables_exists(labels=_labels)
+            classified_labels = self._classify_labels(labels=_labels)
+            labels_failure_output = self._wip_or_hold_lables_exists(labels=_labels, classified_labels=classified_labels)
             if labels_failure_output:
                 failure_output += labels_failure_output
 
-            required_check_failed_failure_output = self._required_check_failed(
-                last_commit_check_runs=last_commit_check_runs, check_runs_in_progress=check_runs_in_progress
-            )
+            required_check_failed_failure_output = self._required_check_failed(failed_check_runs=failed_check_runs)
             if required_check_failed_failure_output:
                 failure_output += required_check_failed_failure_output
 
-            lables_failue_output = self._check_lables_for_can_be_merged(labels=_labels)
+            lables_failue_output = self._check_lables_for_can_be_merged(
+                labels=_labels, classified_labels=classified_labels
+            )
             if lables_failue_output:
                 failure_output += lables_failue_output
 
-            pr_approvered_failure_output = self._check_if_pr_approved(labels=_labels)
+            pr_approvered_failure_output = self._check_if_pr_approved(
+                labels=_labels, classified_labels=classified_labels
+            )
             if pr_approvered_failure_output:
                 failure_output += pr_approvered_failure_output
 
@@ -1377,6 +1790,11 @@ stderr: `{_err}`
 </details>
         """
 
+    @property
+    def _container_registry_url(self) -> str:
+        registry_info = self.container_repository.split("/")
+        return "" if len(registry_info) < 3 else registry_info[0]
+
     def _container_repository_and_tag(self, is_merged: bool = False, tag: str = "") -> str:
         if not tag:
             if is_merged:
@@ -1419,17 +1837,17 @@ stderr: `{_err}`
 
         _container_repository_and_tag = self._container_repository_and_tag(is_merged=is_merged, tag=tag)
         no_cache: str = " --no-cache" if is_merged else ""
-        build_cmd: str = f"--network=host {no_cache} -f {clone_repo_dir}/{self.dockerfile} {clone_repo_dir} -t {_container_repository_and_tag}"
-
-        if self.container_build_args:
-            build_args: str = [f"--build-arg {b_arg}" for b_arg in self.container_build_args][0]
-            build_cmd = f"{build_args} {build_cmd}"
-
-        if self.container_command_args:
-            build_cmd = f"{' '.join(self.container_command_args)} {build_cmd}"
-
+        build_cmd_parts: List[str] = []
         if command_args:
-            build_cmd = f"{command_args} {build_cmd}"
+            build_cmd_parts.append(command_args)
+
+        build_cmd_parts.extend(self.container_command_args or [])
+        build_cmd_parts.extend(f"--build-arg {b_arg}" for b_arg in self.container_build_args or [])
+        build_cmd_parts.append(
+            f"--network=host {no_cache} -f {clone_repo_dir}/{self.dockerfile} {clone_repo_dir} "
+            f"-t {_container_repository_and_tag}"
+        )
+        build_cmd: str = " ".join(build_cmd_parts)
 
         podman_build_cmd: str = f"podman build {build_cmd}"
         with self._prepare_cloned_repo_dir(
@@ -1437,7 +1855,9 @@ stderr: `{_err}`
             tag_name=tag,
             clone_repo_dir=clone_repo_dir,
         ):
-            build_rc, build_out, build_err = self.run_podman_command(command=podman_build_cmd, pipe=True)
+            build_rc, build_out, build_err = self.run_podman_command(
+                command=podman_build_cmd, output_max_size=CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE
+            )
             output: Dict[str, str] = {
                 "title": "Build container",
                 "summary": "",
@@ -1454,8 +1874,19 @@ stderr: `{_err}`
                     return self.set_container_build_failure(output=output)
 
             if push and build_rc:
-                cmd = f"podman push --creds {self.container_repository_username}:{self.container_repository_password} {_container_repository_and_tag}"
-                push_rc, _, _ = self.run_podman_command(command=cmd)
+                # Log in with the password on stdin into a throwaway auth file instead of passing it with --creds
+                with tempfile.TemporaryDirectory() as auth_dir:
+                    auth_file = os.path.join(auth_dir, "auth.json")
+                    push_rc, _, _ = self.run_podman_command(
+                        command=f"podman login --authfile {auth_file} --username {self.container_repository_username} "
+                        f"--password-stdin {self._container_registry_url}",
+                        input=self.container_repository_password,
+                    )
+                    if push_rc:
+                        push_rc, _, _ = self.run_podman_command(
+                            command=f"podman push --authfile {auth_file} {_container_repository_and_tag}"
+                        )
+
                 if push_rc:
                     push_msg: str = f"New container for {_container_repository_and_tag} published"
                     if pull_request:
@@ -1500,6 +1931,7 @@ stderr: `{_err}`
             rc, out, err = run_command(
                 command=f"uvx pip wheel --no-cache-dir -w {clone_repo_dir}/dist {clone_repo_dir}",
                 log_prefix=self.log_prefix,
+                output_max_size=CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE,
             )
 
             output: Dict[str, str] = {
@@ -1515,10 +1947,8 @@ stderr: `{_err}`
     def send_slack_message(self, message: str, webhook_url: str) -> None:
         slack_data: Dict[str, str] = {"text": message}
         self.logger.info(f"{self.log_prefix} Sending message to slack: {message}")
-        response: requests.Response = requests.post(
-            webhook_url,
-            data=json.dumps(slack_data),
-            headers={"Content-Type": "application/json"},
+        response: requests.Response = get_requests_session().post(
+            webhook_url, json=slack_data, timeout=SLACK_REQUEST_TIMEOUT
         )
         if response.status_code != 200:
             raise ValueError(
@@ -1547,6 +1977,9 @@ stderr: `{_err}`
         _comment.create_reaction(reaction)
 
     def process_opened_or_synchronize_pull_request(self) -> None:
+        self._use_repository_mirror = (
+            sum(bool(_check) for _check in (self.tox, self.pre_commit, self.pypi, self.build_and_push_container)) > 1
+        )
         prepare_pull_futures: List[Future] = []
         with ThreadPoolExecutor() as executor:
             prepare_pull_futures.append(executor.submit(self.assign_reviewers))
@@ -1557,11 +1990,7 @@ stderr: `{_err}`
                 )
             )
             prepare_pull_futures.append(executor.submit(self.label_pull_request_by_merge_state))
-            prepare_pull_futures.append(executor.submit(self.set_merge_check_queued))
-            prepare_pull_futures.append(executor.submit(self.set_run_tox_check_queued))
-            prepare_pull_futures.append(executor.submit(self.set_run_pre_commit_check_queued))
-            prepare_pull_futures.append(executor.submit(self.set_python_module_install_queued))
-            prepare_pull_futures.append(executor.submit(self.set_container_build_queued))
+            prepare_pull_futures.append(executor.submit(self.set_check_runs_queued))
             prepare_pull_futures.append(executor.submit(self._process_verified_for_update_or_new_pull_request))
             prepare_pull_futures.append(executor.submit(self.add_size_label))
             prepare_pull_futures.append(executor.submit(self.add_pull_request_owner_as_assingee))
@@ -1576,10 +2005,19 @@ stderr: `{_err}`
                 self.logger.error(f"{self.log_prefix} {_exp}")
 
     def is_check_run_in_progress(self, check_run: str) -> bool:
-        for run in self.last_commit.get_check_runs():
-            if run.name == check_run and run.status == IN_PROGRESS_STR:
+        # Started by this event, no need to ask GitHub
+        with self._check_runs_state_lock:
+            if self._check_runs_state.get((check_run, self.last_commit.sha)) == IN_PROGRESS_STR:
                 return True
-        return False
+
+        with self._check_runs_in_progress_lock:
+            if self.last_commit.sha not in self._check_runs_in_progress:
+                # Let GitHub filter by status, only the in progress check runs are sent back
+                self._check_runs_in_progress[self.last_commit.sha] = frozenset(
+                    run.name for run in self.last_commit.get_check_runs(status=IN_PROGRESS_STR)
+                )
+
+            return check_run in self._check_runs_in_progress[self.last_commit.sha]
 
     def set_check_run_status(
         self,
@@ -1601,8 +2039,13 @@ stderr: `{_err}`
 
         msg: str = f"{self.log_prefix} check run {check_run} status: {status or conclusion}"
 
+        if self._skip_check_run_status(check_run=check_run, state=conclusion or status, output=output):
+            self.logger.debug(f"{self.log_prefix} check run {check_run} is already {status or conclusion}, skipping")
+            return
+
         try:
             self.repository_by_github_app.create_check_run(**kwargs)
+            self._set_check_run_state(check_run=check_run, state=conclusion or status)
             if conclusion in (SUCCESS_STR, IN_PROGRESS_STR):
                 self.logger.success(msg)  # type: ignore
             return
@@ -1611,6 +2054,101 @@ stderr: `{_err}`
             self.logger.debug(f"{self.log_prefix} Failed to set {check_run} check to {status or conclusion}, {ex}")
             kwargs["conclusion"] = FAILURE_STR
             self.repository_by_github_app.create_check_run(**kwargs)
+            self._set_check_run_state(check_run=check_run, state=FAILURE_STR)
+
+    def set_check_runs_queued(self) -> None:
+        check_runs: List[str] = [CAN_BE_MERGED_STR]
+        if self.tox:
+            check_runs.append(TOX_STR)
+
+        if self.pre_commit:
+            check_runs.append(PRE_COMMIT_STR)
+
+        if self.pypi:
+            check_runs.append(PYTHON_MODULE_INSTALL_STR)
+
+        if self.build_and_push_container:
+            check_runs.append(BUILD_CONTAINER_STR)
+
+        check_runs = [
+            _check_run
+            for _check_run in check_runs
+            if not self._skip_check_run_status(check_run=_check_run, state=QUEUED_STR, output=None)
+        ]
+        if not check_runs:
+            return
+
+        # Create all the queued check runs with one GraphQL mutation instead of a REST POST per check run
+        mutation_variables = ", ".join(f"$name{idx}: String!" for idx in range(len(check_runs)))
+        mutation_fields = " ".join(
+            f"check{idx}: createCheckRun(input: {{repositoryId: $repositoryId, headSha: $headSha, name: $name{idx}, "
+            "status: QUEUED}) { checkRun { id } }"
+            for idx in range(len(check_runs))
+        )
+        variables: Dict[str, Any] = {
+            "repositoryId": self.repository_by_github_app.node_id,
+            "headSha": self.last_commit.sha,
+            **{f"name{idx}": _check_run for idx, _check_run in enumerate(check_runs)},
+        }
+
+        query = f"mutation($repositoryId: ID!, $headSha: GitObjectID!, {mutation_variables}) {{ {mutation_fields} }}"
+
+        try:
+            _, response = self.github_app_api.requester.graphql_query(query=query, variables=variables)
+
+        except GithubException as ex:
+            # graphql_query raises on any error entry, the check runs created before the error are still in the data
+            self.logger.debug(f"{self.log_prefix} Failed to queue some of the check runs {check_runs}, {ex}")
+            response = ex.data if isinstance(ex.data, dict) else {}
+
+        created_check_runs: Dict[str, Any] = response.get("data") or {}
+        for idx, _check_run in enumerate(check_runs):
+            if not created_check_runs.get(f"check{idx}"):
+                self.repository_by_github_app.create_check_run(
+                    name=_check_run, head_sha=self.last_commit.sha, status=QUEUED_STR
+                )
+
+            self._set_check_run_state(check_run=_check_run, state=QUEUED_STR)
+
+    def _skip_check_run_status(self, check_run: str, state: str, output: Optional[Dict[str, str]]) -> bool:
+        # Writing the same state twice is a wasted API call, and a queued write must not override a running check
+        with self._check_runs_state_lock:
+            _previous_state = self._check_runs_state.get((check_run, self.last_commit.sha))
+
+        return (_previous_state == state and not output) or (state == QUEUED_STR and _previous_state == IN_PROGRESS_STR)
+
+    def _set_check_run_state(self, check_run: str, state: str) -> None:
+        # Only called once GitHub accepted the write, the cache must never claim a state GitHub does not have
+        with self._check_runs_state_lock:
+            self._check_runs_state[(check_run, self.last_commit.sha)] = state
+
+    @functools.cached_property
+    def _repository_clone_url(self) -> str:
+        return self.repository.clone_url.replace("https://", f"https://{self.token}@")
+
+    def _get_repository_mirror_dir(self) -> Optional[str]:
+        # The checks of an event run concurrently, clone over the network once and let each check clone locally.
+        # A bare clone only has the branches and tags, the pull requests refs are fetched by each check from GitHub
+        if not self._use_repository_mirror:
+            return None
+
+        with self._repository_mirror_lock:
+            if self._repository_mirror_failed:
+                return None
+
+            if not self._repository_mirror_dir:
+                mirror_dir = f"{self.clone_repo_dir}-mirror-{uuid4()}"
+                rc, _, _ = run_command(
+                    command=f"git clone --bare {self._repository_clone_url} {mirror_dir}", log_prefix=self.log_prefix
+                )
+                if not rc:
+                    shutil.rmtree(mirror_dir, ignore_errors=True)
+                    self._repository_mirror_failed = True
+                    return None
+
+                self._repository_mirror_dir = mirror_dir
+
+            return self._repository_mirror_dir
 
     @contextlib.contextmanager
     def _prepare_cloned_repo_dir(
@@ -1622,13 +2160,20 @@ stderr: `{_err}`
     ) -> Generator[None, None, None]:
         git_cmd = f"git --work-tree={clone_repo_dir} --git-dir={clone_repo_dir}/.git"
 
-        # Clone the repository
-        run_command(
-            command=f"git clone {self.repository.clone_url.replace('https://', f'https://{self.token}@')} "
-            f"{clone_repo_dir}",
-            log_prefix=self.log_prefix,
-        )
         try:
+            # Clone the repository from the local mirror when there is one, origin is pointed back to GitHub before
+            # fetching so only the objects missing from the mirror are downloaded
+            if repository_mirror_dir := self._get_repository_mirror_dir():
+                run_command(command=f"git clone {repository_mirror_dir} {clone_repo_dir}", log_prefix=self.log_prefix)
+                run_command(
+                    command=f"{git_cmd} remote set-url origin {self._repository_clone_url}", log_prefix=self.log_prefix
+                )
+
+            else:
+                run_command(
+                    command=f"git clone {self._repository_clone_url} {clone_repo_dir}", log_prefix=self.log_prefix
+                )
+
             run_command(
                 command=f"{git_cmd} config user.name '{self.repository.owner.login}'", log_prefix=self.log_prefix
             )
@@ -1667,15 +2212,12 @@ stderr: `{_err}`
 
         finally:
             self.logger.debug(f"{self.log_prefix} Deleting {clone_repo_dir}")
-            shutil.rmtree(clone_repo_dir)
+            shutil.rmtree(clone_repo_dir, ignore_errors=True)
 
     @staticmethod
     def get_check_run_text(err: str, out: str) -> str:
-        total_len: int = len(err) + len(out)
-        if total_len > 65534:  # GitHub limit is 65535 characters
-            return f"```\n{err}\n\n{out}\n```"[:65534]
-        else:
-            return f"```\n{err}\n\n{out}\n```"
+        # Checks commands output is bounded by CHECK_RUN_COMMAND_OUTPUT_MAX_SIZE, the slice only guards other callers
+        return f"```\n{err}\n\n{out}\n```"[:CHECK_RUN_TEXT_MAX_LENGTH]
 
     def get_jira_conn(self) -> JiraApi:
         return JiraApi(
@@ -1685,11 +2227,11 @@ stderr: `{_err}`
         )
 
     def get_story_key_with_jira_connection(self) -> str:
-        _story_label = [_label for _label in self.pull_request.labels if _label.name.startswith(JIRA_STR)]
+        _story_label = [_label for _label in self.pull_request_labels_names() if _label.startswith(JIRA_STR)]
         if not _story_label:
             return ""
 
-        if _story_key := _story_label[0].name.split(":")[-1]:
+        if _story_key := _story_label[0].split(":")[-1]:
             jira_conn = self.get_jira_conn()
             if not jira_conn:
                 self.logger.error(f"{self.log_prefix} Jira connection not found")
@@ -1703,9 +2245,20 @@ stderr: `{_err}`
             )
             return []
 
+        _key = (self.repository_full_name, self.pull_request_branch)
+        with _BRANCH_REQUIRED_STATUS_CHECKS_CACHE_LOCK:
+            _cached = _BRANCH_REQUIRED_STATUS_CHECKS_CACHE.get(_key)
+
+        if _cached and time.monotonic() - _cached[0] < BRANCH_REQUIRED_STATUS_CHECKS_TTL:
+            return list(_cached[1])
+
         pull_request_branch = self.repository.get_branch(self.pull_request_branch)
         branch_protection = pull_request_branch.get_protection()
-        return branch_protection.required_status_checks.contexts
+        required_status_checks: List[str] = branch_protection.required_status_checks.contexts
+        with _BRANCH_REQUIRED_STATUS_CHECKS_CACHE_LOCK:
+            _BRANCH_REQUIRED_STATUS_CHECKS_CACHE[_key] = (time.monotonic(), required_status_checks)
+
+        return list(required_status_checks)
 
     def get_all_required_status_checks(self) -> List[str]:
         if not hasattr(self, "pull_request_branch"):
@@ -1750,7 +2303,6 @@ stderr: `{_err}`
             reviewers_and_approvers = self.root_reviewers + self.root_approvers
             if self.parent_committer in reviewers_and_approvers:
                 self.jira_assignee = self.jira_user_mapping.get(self.parent_committer)
-                self.add_api_users_to_auto_verified_and_merged_users
                 if not self.jira_assignee:
                     self.logger.debug(
                         f"{self.log_prefix} Jira tracking is disabled for the current pull request. "
@@ -1774,13 +2326,19 @@ stderr: `{_err}`
         _exits_target_branches: Set[str] = set()
         _non_exits_target_branches_msg: str = ""
 
-        for _target_branch in _target_branches:
-            try:
-                self.repository.get_branch(_target_branch)
-            except Exception:
+        # Check the target branches concurrently, one API round-trip each
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            get_branch_futures: Dict[str, Future] = {
+                _target_branch: executor.submit(self.repository.get_branch, _target_branch)
+                for _target_branch in _target_branches
+            }
+
+        for _target_branch, get_branch_future in get_branch_futures.items():
+            if get_branch_future.exception():
                 _non_exits_target_branches_msg += f"Target branch `{_target_branch}` does not exist\n"
 
-            _exits_target_branches.add(_target_branch)
+            else:
+                _exits_target_branches.add(_target_branch)
 
         if _non_exits_target_branches_msg:
             self.logger.info(f"{self.log_prefix} {_non_exits_target_branches_msg}")
@@ -1793,7 +2351,7 @@ stderr: `{_err}`
                 ]
                 info_msg: str = f"""
 Cherry-pick requested for PR: `{self.pull_request.title}` by user `{reviewed_user}`
-Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automatic cheery-pick once the PR is merged
+Adding label/s `{" ".join(cp_labels)}` for automatic cheery-pick once the PR is merged
 """
                 self.logger.info(f"{self.log_prefix} {info_msg}")
                 self.pull_request.create_issue_comment(info_msg)
@@ -1860,27 +2418,16 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
                     self.logger.error(f"{self.log_prefix} {_exp}")
 
     def remove_labels_when_pull_request_sync(self) -> None:
-        futures = []
+        # Remove only the review labels, labels added meanwhile by other events must stay
+        futures: List[Future] = []
         with ThreadPoolExecutor() as executor:
-            for _label in self.pull_request.labels:
-                _label_name = _label.name
-                if (
-                    _label_name.startswith(APPROVED_BY_LABEL_PREFIX)
-                    or _label_name.startswith(COMMENTED_BY_LABEL_PREFIX)
-                    or _label_name.startswith(CHANGED_REQUESTED_BY_LABEL_PREFIX)
-                    or _label_name.startswith(LGTM_BY_LABEL_PREFIX)
-                ):
-                    futures.append(
-                        executor.submit(
-                            self._remove_label,
-                            **{
-                                "label": _label_name,
-                            },
-                        )
-                    )
-        for _ in as_completed(futures):
-            # wait for all tasks to complete
-            pass
+            for _label_name in self.pull_request_labels_names():
+                if _label_name.startswith(REVIEW_LABEL_PREFIXES):
+                    futures.append(executor.submit(self._remove_label, **{"label": _label_name}))
+
+        for result in as_completed(futures):
+            if _exp := result.exception():
+                self.logger.error(f"{self.log_prefix} {_exp}")
 
     def create_jira_when_open_pull_reques(self) -> None:
         jira_conn = self.get_jira_conn()
@@ -1933,7 +2480,7 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
                 )
 
     def update_jira_when_pull_request_updated(self, reviewed_user: str, review_state: str) -> None:
-        _story_label = [_label for _label in self.pull_request.labels if _label.name.startswith(JIRA_STR)]
+        _story_label = [_label for _label in self.pull_request_labels_names() if _label.startswith(JIRA_STR)]
         if _story_label:
             if reviewed_user == self.parent_committer or reviewed_user == self.last_committer:
                 self.logger.info(
@@ -1941,7 +2488,7 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
                 )
                 return
 
-            _story_key = _story_label[0].name.split(":")[-1]
+            _story_key = _story_label[0].split(":")[-1]
             jira_conn = self.get_jira_conn()
             if not jira_conn:
                 self.logger.error(f"{self.log_prefix} Jira connection not found")
@@ -2009,15 +2556,21 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
         shutil.rmtree("/tmp/storage-run-1000/containers", ignore_errors=True)
         shutil.rmtree("/tmp/storage-run-1000/libpod/tmp", ignore_errors=True)
 
-    def run_podman_command(self, command: str, pipe: bool = False) -> Tuple[bool, str, str]:
-        rc, out, err = run_command(command=command, log_prefix=self.log_prefix, pipe=pipe)
+    def run_podman_command(
+        self, command: str, pipe: bool = False, output_max_size: Optional[int] = None, **kwargs: Any
+    ) -> Tuple[bool, str, str]:
+        rc, out, err = run_command(
+            command=command, log_prefix=self.log_prefix, pipe=pipe, output_max_size=output_max_size, **kwargs
+        )
 
         if rc:
             return rc, out, err
 
         if self.is_podman_bug(err=err):
             self.fix_podman_bug()
-            return run_command(command=command, log_prefix=self.log_prefix, pipe=pipe)
+            return run_command(
+                command=command, log_prefix=self.log_prefix, pipe=pipe, output_max_size=output_max_size, **kwargs
+            )
 
         return rc, out, err
 
@@ -2029,6 +2582,11 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
         owners_count = 0
 
         tree = self.repository.get_git_tree(self.pull_request_branch, recursive=True)
+        with _OWNERS_CONTENT_CACHE_LOCK:
+            if tree.sha in _OWNERS_TREE_CACHE:
+                _OWNERS_TREE_CACHE.move_to_end(tree.sha)
+                return _OWNERS_TREE_CACHE[tree.sha]
+
         for element in tree.tree:
             if element.type == "blob" and element.path.endswith("OWNERS"):
                 owners_count += 1
@@ -2037,12 +2595,8 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
                     break
 
                 content_path = element.path
-                _path = self.repository.get_contents(content_path)
-                if isinstance(_path, list):
-                    _path = _path[0]
-
                 try:
-                    content = yaml.safe_load(_path.decoded_content)
+                    content = self._get_owners_file_content(content_path=content_path, sha=element.sha)
                     if self._validate_owners_content(content, content_path):
                         parent_path = str(Path(content_path).parent)
                         if not parent_path:
@@ -2053,8 +2607,31 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
                     self.logger.error(f"{self.log_prefix} Invalid OWNERS file {content_path}: {exp}")
                     continue
 
+        with _OWNERS_CONTENT_CACHE_LOCK:
+            _OWNERS_TREE_CACHE[tree.sha] = _owners
+            if len(_OWNERS_TREE_CACHE) > OWNERS_TREE_CACHE_MAX_SIZE:
+                _OWNERS_TREE_CACHE.popitem(last=False)
+
         return _owners
 
+    def _get_owners_file_content(self, content_path: str, sha: str) -> Any:
+        with _OWNERS_CONTENT_CACHE_LOCK:
+            if sha in _OWNERS_CONTENT_CACHE:
+                _OWNERS_CONTENT_CACHE.move_to_end(sha)
+                return _OWNERS_CONTENT_CACHE[sha]
+
+        _path = self.repository.get_contents(content_path, ref=self.pull_request_branch)
+        if isinstance(_path, list):
+            _path = _path[0]
+
+        content = yaml.load(_path.decoded_content, Loader=YamlSafeLoader)
+        with _OWNERS_CONTENT_CACHE_LOCK:
+            _OWNERS_CONTENT_CACHE[sha] = content
+            if len(_OWNERS_CONTENT_CACHE) > OWNERS_CONTENT_CACHE_MAX_SIZE:
+                _OWNERS_CONTENT_CACHE.popitem(last=False)
+
+        return content
+
     def get_all_approvers(self) -> list[str]:
         _approvers: list[str] = []
         for list_of_approvers in self.owners_data_for_changed_files().values():
@@ -2130,111 +2707,120 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
             self.logger.error(f"{self.log_prefix} Invalid OWNERS file {path}: {e}")
             return False
 
-    def _required_check_in_progress(self, last_commit_check_runs: list[CheckRun]) -> tuple[str, list[str]]:
-        self.all_required_status_checks = self.get_all_required_status_checks()
-        last_commit_check_runs = list(self.last_commit.get_check_runs())
+    def _required_check_runs_in_progress_and_failed(
+        self, last_commit_check_runs: list[CheckRun]
+    ) -> tuple[list[str], list[str]]:
+        # Single pass over the check runs, a required check run is either in progress, failed or fine
+        check_runs_in_progress: list[str] = []
+        failed_check_runs: list[str] = []
+        for check_run in last_commit_check_runs:
+            if check_run.name == CAN_BE_MERGED_STR or check_run.name not in self.all_required_status_checks:
+                continue
+
+            if check_run.status == IN_PROGRESS_STR:
+                check_runs_in_progress.append(check_run.name)
+
+            elif check_run.conclusion not in (SUCCESS_STR, QUEUED_STR):
+                failed_check_runs.append(check_run.name)
+
+        # A failed run that is running again is reported as in progress only
+        return check_runs_in_progress, [_name for _name in failed_check_runs if _name not in check_runs_in_progress]
+
+    def _required_check_in_progress(self, check_runs_in_progress: list[str]) -> str:
         self.logger.debug(f"{self.log_prefix} Check if any required check runs in progress.")
-        check_runs_in_progress = [
-            check_run.name
-            for check_run in last_commit_check_runs
-            if check_run.status == IN_PROGRESS_STR
-            and check_run.name != CAN_BE_MERGED_STR
-            and check_run.name in self.all_required_status_checks
-        ]
         if check_runs_in_progress:
             self.logger.debug(
                 f"{self.log_prefix} Some required check runs in progress {check_runs_in_progress}, "
                 f"skipping check if {CAN_BE_MERGED_STR}."
             )
-            return f"Some required check runs in progress {', '.join(check_runs_in_progress)}\n", check_runs_in_progress
-        return "", []
-
-    def _required_check_failed(self, last_commit_check_runs: list[CheckRun], check_runs_in_progress: list[str]) -> str:
-        failed_check_runs = []
-        for check_run in last_commit_check_runs:
-            if (
-                check_run.name == CAN_BE_MERGED_STR
-                or check_run.conclusion == SUCCESS_STR
-                or check_run.conclusion == QUEUED_STR
-                or check_run.name not in self.all_required_status_checks
-            ):
-                continue
-
-            failed_check_runs.append(check_run.name)
+            return f"Some required check runs in progress {', '.join(check_runs_in_progress)}\n"
+        return ""
 
+    def _required_check_failed(self, failed_check_runs: list[str]) -> str:
         if failed_check_runs:
-            exclude_in_progress = [
-                failed_check_run
-                for failed_check_run in failed_check_runs
-                if failed_check_run not in check_runs_in_progress
-            ]
-            return f"Some check runs failed: {', '.join(exclude_in_progress)}\n"
+            return f"Some check runs failed: {', '.join(failed_check_runs)}\n"
 
         return ""
 
-    def _wip_or_hold_lables_exists(self, labels: list[str]) -> str:
+    @staticmethod
+    def _classify_labels(labels: List[str]) -> Dict[str, Any]:
+        """
+        Sort the pull request labels into the buckets used by the merge checks in a single pass.
+        """
+        classified_labels: Dict[str, Any] = {
+            "names": frozenset(labels),
+            "approvers": set(),
+            "change_requesters": set(),
+            "lgtm": set(),
+            "has_hold": False,
+            "has_wip": False,
+            "cherry_pick_targets": [],
+        }
+        for _label in labels:
+            if _label == HOLD_LABEL_STR:
+                classified_labels["has_hold"] = True
+
+            elif _label == WIP_STR:
+                classified_labels["has_wip"] = True
+
+            elif _label.startswith(CHERRY_PICK_LABEL_PREFIX):
+                classified_labels["cherry_pick_targets"].append(_label[len(CHERRY_PICK_LABEL_PREFIX) :])
+
+            else:
+                _label_lower = _label.lower()
+                for _bucket, _prefix in _USER_LABEL_PREFIXES_BUCKETS:
+                    if _label_lower.startswith(_prefix):
+                        classified_labels[_bucket].add(_label[len(_prefix) :])
+                        break
+
+        return classified_labels
+
+    def _wip_or_hold_lables_exists(self, labels: List[str], classified_labels: Optional[Dict[str, Any]] = None) -> str:
         failure_output = ""
-        is_hold = HOLD_LABEL_STR in labels
-        is_wip = WIP_STR in labels
+        classified_labels = classified_labels or self._classify_labels(labels=labels)
 
-        if is_hold or is_wip:
-            if is_hold:
-                failure_output += "Hold label exists.\n"
+        if classified_labels["has_hold"]:
+            failure_output += "Hold label exists.\n"
 
-            if is_wip:
-                failure_output += "WIP label exists.\n"
+        if classified_labels["has_wip"]:
+            failure_output += "WIP label exists.\n"
 
         return failure_output
 
-    def _check_lables_for_can_be_merged(self, labels: list[str]) -> str:
+    def _check_lables_for_can_be_merged(
+        self, labels: List[str], classified_labels: Optional[Dict[str, Any]] = None
+    ) -> str:
         failure_output = ""
+        classified_labels = classified_labels or self._classify_labels(labels=labels)
 
-        for _label in labels:
-            if CHANGED_REQUESTED_BY_LABEL_PREFIX.lower() in _label.lower():
-                change_request_user = _label.split("-")[-1]
-                if change_request_user in self.all_approvers:
-                    failure_output += "PR has changed requests from approvers\n"
+        if classified_labels["change_requesters"].intersection(self.all_approvers):
+            failure_output += "PR has changed requests from approvers\n"
 
-        missing_required_labels = []
-        for _req_label in self.can_be_merged_required_labels:
-            if _req_label not in labels:
-                missing_required_labels.append(_req_label)
+        missing_required_labels = [
+            _req_label
+            for _req_label in self.can_be_merged_required_labels
+            if _req_label not in classified_labels["names"]
+        ]
 
         if missing_required_labels:
             failure_output += f"Missing required labels: {', '.join(missing_required_labels)}\n"
 
         return failure_output
 
-    def _check_if_pr_approved(self, labels: list[str]) -> str:
-        approved_by = []
-        for _label in labels:
-            if APPROVED_BY_LABEL_PREFIX.lower() in _label.lower():
-                approved_user = _label.split("-")[-1]
-                if self.parent_committer == approved_user:
-                    continue
-
-                approved_by.append(approved_user)
+    def _check_if_pr_approved(self, labels: List[str], classified_labels: Optional[Dict[str, Any]] = None) -> str:
+        classified_labels = classified_labels or self._classify_labels(labels=labels)
+        approved_by = classified_labels["approvers"] - {self.parent_committer}
 
-        missing_approvers = self.all_approvers.copy()
+        missing_approvers = set(self.all_approvers) - {self.parent_committer}
 
         for data in self.owners_data_for_changed_files().values():
             required_pr_approvers = data.get("approvers", [])
-            for required_pr_approver in required_pr_approvers:
-                if required_pr_approver in approved_by:
-                    # Once we found approver in approved_by list, we remove all approvers from missing_approvers list for this owners file
-                    {
-                        missing_approvers.remove(_approver)  # type: ignore
-                        for _approver in required_pr_approvers
-                        if _approver in missing_approvers
-                    }
-                    break
-
-        missing_approvers = list(set(missing_approvers))
-        if self.parent_committer in missing_approvers:
-            missing_approvers.remove(self.parent_committer)
+            # An approval from any approver of an owners file covers all its approvers
+            if approved_by.intersection(required_pr_approvers):
+                missing_approvers.difference_update(required_pr_approvers)
 
         if missing_approvers:
-            return f"Missing lgtm/approved from approvers: {', '.join(missing_approvers)}\n"
+            return f"Missing lgtm/approved from approvers: {', '.join(sorted(missing_approvers))}\n"
 
         return ""
 
@@ -2260,7 +2846,7 @@ Adding label/s `{" ".join([_cp_label for _cp_label in cp_labels])}` for automati
         self.set_conventional_title_in_progress()
         allowed_names = self.conventional_title.split(",")
         title = self.pull_request.title
-        if any([title.startswith(f"{_name}:") for _name in allowed_names]):
+        if title.startswith(tuple(f"{_name}:" for _name in allowed_names)):
             self.set_conventional_title_success(output=output)
         else:
             output["summary"] = "Failed"
@@ -1,9 +1,20 @@
+import functools
 from typing import Any, Dict, List
 from jira import Issue, JIRA
 
 from webhook_server_container.utils.helpers import get_logger_with_params
 
 
+@functools.lru_cache(maxsize=16)
+def get_jira_client(server: str, token: str) -> JIRA:
+    """
+    Get Jira client, one per server and token is kept for the process lifetime to reuse its session.
+    """
+    conn = JIRA(server=server, token_auth=token)
+    conn.my_permissions()
+    return conn
+
+
 class JiraApi:
     def __init__(self, server: str, project: str, token: str):
         self.logger = get_logger_with_params(name="JiraApi")
@@ -11,11 +22,7 @@ class JiraApi:
         self.project = project
         self.token = token
 
-        self.conn: JIRA = JIRA(
-            server=self.server,
-            token_auth=self.token,
-        )
-        self.conn.my_permissions()
+        self.conn: JIRA = get_jira_client(server=self.server, token=self.token)
         self.fields: Dict[str, Any] = {"project": {"key": self.project}}
 
     def create_story(self, title: str, body: str, epic_key: str, assignee: str) -> str:
@@ -21,6 +21,7 @@ class Tree:
     def __init__(self, path: str):
         self.type = "blob"
         self.path = path
+        self.sha = f"{path}-sha"
 
     @property
     def tree(self):
@@ -52,7 +53,7 @@ class Repository:
     def get_git_tree(self, sha: str, recursive: bool):
         return Tree("")
 
-    def get_contents(self, path: str):
+    def get_contents(self, path: str, ref: str = ""):
         owners_data = yaml.dump({
             "approvers": ["root_approver1", "root_approver2"],
             "reviewers": ["root_reviewer1", "root_reviewer2"],
@@ -101,6 +102,8 @@ def process_github_webhook(mocker, request):
     mocker.patch("github.AuthenticatedUser", return_value=True)
     mocker.patch(f"{base_import_path}.get_api_with_highest_rate_limit", return_value=("API", "TOKEN"))
     mocker.patch(f"{base_import_path}.get_github_repo_api", return_value=Repository())
+    # Known log color, so the tests never write log-colors.json into the manifests dir
+    mocker.patch.object(ProcessGithubWehook, "_log_colors", {Repository().name: "green"})
 
     process_github_webhook = ProcessGithubWehook(
         {"repository": {"name": Repository().name}}, Headers({"X-GitHub-Event": "test-event"}), logging.getLogger()
@@ -1,5 +1,7 @@
 import logging
 
+from github.GithubException import GithubException
+
 
 class User:
     def __init__(self, username):
@@ -39,3 +41,35 @@ def test_add_reviewer_by_user_comment_invalid_user(caplog, process_github_webhoo
     process_github_webhook._add_reviewer_by_user_comment("user2")
     caplog.set_level(logging.DEBUG)
     assert "not adding reviewer user2 by user comment, user2 is not part of contributers" in caplog.text
+
+
+def test_assign_reviewers_skip_requested(mocker, process_github_webhook):
+    pull_request = mocker.Mock()
+    pull_request.user.login = "author"
+    pull_request.get_review_requests.return_value = ([User("requested")], [])
+    process_github_webhook.pull_request = pull_request
+    process_github_webhook.all_reviewers = ["reviewer2", "author", "requested", "reviewer1", "reviewer1"]
+
+    process_github_webhook.assign_reviewers()
+    pull_request.create_review_request.assert_called_once_with(["reviewer1", "reviewer2"])
+
+
+def test_assign_reviewers_fallback_one_by_one(mocker, process_github_webhook):
+    def _create_review_request(reviewers):
+        if "invalid" in reviewers:
+            raise GithubException(status=422)
+
+    pull_request = mocker.Mock()
+    pull_request.user.login = "author"
+    pull_request.get_review_requests.return_value = ([], [])
+    pull_request.create_review_request.side_effect = _create_review_request
+    process_github_webhook.pull_request = pull_request
+    process_github_webhook.all_reviewers = ["invalid", "reviewer1"]
+
+    process_github_webhook.assign_reviewers()
+    assert pull_request.create_review_request.call_args_list == [
+        mocker.call(["invalid", "reviewer1"]),
+        mocker.call(["invalid"]),
+        mocker.call(["reviewer1"]),
+    ]
+    pull_request.create_issue_comment.assert_called_once()
@@ -0,0 +1,110 @@
+from github import GithubException
+
+
+def test_set_check_run_status_skip_redundant_writes(process_github_webhook, mocker):
+    repository_by_github_app = mocker.Mock()
+    process_github_webhook.repository_by_github_app = repository_by_github_app
+    process_github_webhook.last_commit = mocker.Mock(sha="abc")
+    process_github_webhook.logger = mocker.Mock()
+
+    process_github_webhook.set_merge_check_queued()
+    process_github_webhook.set_merge_check_queued()
+    process_github_webhook.set_run_tox_check_in_progress()
+    process_github_webhook.set_run_tox_check_queued()
+    process_github_webhook.set_run_tox_check_success(output={"title": "tox", "summary": "", "text": "ok"})
+
+    assert [
+        _call.kwargs.get("status") or _call.kwargs.get("conclusion")
+        for _call in repository_by_github_app.create_check_run.call_args_list
+    ] == ["queued", "in_progress", "success"]
+
+
+def test_set_check_run_status_failed_write_not_cached(process_github_webhook, mocker):
+    repository_by_github_app = mocker.Mock()
+    repository_by_github_app.create_check_run.side_effect = [GithubException(500), None, None]
+    process_github_webhook.repository_by_github_app = repository_by_github_app
+    process_github_webhook.last_commit = mocker.Mock(sha="abc")
+    process_github_webhook.last_commit.get_check_runs.return_value = []
+    process_github_webhook.logger = mocker.Mock()
+
+    process_github_webhook.set_run_tox_check_in_progress()
+    assert not process_github_webhook.is_check_run_in_progress(check_run="tox")
+
+    process_github_webhook.set_run_tox_check_in_progress()
+    assert [
+        _call.kwargs.get("conclusion") or _call.kwargs.get("status")
+        for _call in repository_by_github_app.create_check_run.call_args_list
+    ] == ["in_progress", "failure", "in_progress"]
+
+
+def test_is_check_run_in_progress_started_by_event(process_github_webhook, mocker):
+    process_github_webhook.repository_by_github_app = mocker.Mock()
+    process_github_webhook.last_commit = mocker.Mock(sha="abc")
+    process_github_webhook.last_commit.get_check_runs.return_value = []
+    process_github_webhook.logger = mocker.Mock()
+
+    assert not process_github_webhook.is_check_run_in_progress(check_run="tox")
+    process_github_webhook.set_run_tox_check_in_progress()
+    assert process_github_webhook.is_check_run_in_progress(check_run="tox")
+    process_github_webhook.last_commit.get_check_runs.assert_called_once()
+
+
+def test_is_check_run_in_progress_lists_check_runs_once(process_github_webhook, mocker):
+    process_github_webhook.last_commit = mocker.Mock(sha="abc")
+    process_github_webhook.last_commit.get_check_runs.return_value = [mocker.Mock(status="in_progress")]
+    process_github_webhook.last_commit.get_check_runs.return_value[0].name = "tox"
+
+    assert process_github_webhook.is_check_run_in_progress(check_run="tox")
+    assert not process_github_webhook.is_check_run_in_progress(check_run="pre-commit")
+    assert not process_github_webhook.is_check_run_in_progress(check_run="build-container")
+    process_github_webhook.last_commit.get_check_runs.assert_called_once_with(status="in_progress")
+
+
+def test_set_check_runs_queued_single_request(process_github_webhook, mocker):
+    repository_by_github_app = mocker.Mock(node_id="R_1")
+    process_github_webhook.repository_by_github_app = repository_by_github_app
+    process_github_webhook.last_commit = mocker.Mock(sha="abc")
+    process_github_webhook.logger = mocker.Mock()
+    process_github_webhook.tox = {"main": "all"}
+    process_github_webhook.pre_commit = False
+    process_github_webhook.pypi = {}
+    process_github_webhook.build_and_push_container = {}
+
+    process_github_webhook.github_app_api = mocker.Mock()
+    graphql_query = process_github_webhook.github_app_api.requester.graphql_query
+    graphql_query.return_value = ({}, {"data": {"check0": {"checkRun": {"id": 1}}, "check1": {"checkRun": {"id": 2}}}})
+
+    process_github_webhook.set_check_runs_queued()
+    process_github_webhook.set_merge_check_queued()
+
+    graphql_query.assert_called_once()
+    assert graphql_query.call_args.kwargs["variables"] == {
+        "repositoryId": "R_1",
+        "headSha": "abc",
+        "name0": "can-be-merged",
+        "name1": "tox",
+    }
+    repository_by_github_app.create_check_run.assert_not_called()
+
+
+def test_set_check_runs_queued_partial_failure(process_github_webhook, mocker):
+    repository_by_github_app = mocker.Mock(node_id="R_1")
+    process_github_webhook.repository_by_github_app = repository_by_github_app
+    process_github_webhook.last_commit = mocker.Mock(sha="abc")
+    process_github_webhook.logger = mocker.Mock()
+    process_github_webhook.tox = {"main": "all"}
+    process_github_webhook.pre_commit = True
+    process_github_webhook.pypi = {}
+    process_github_webhook.build_and_push_container = {}
+    process_github_webhook.github_app_api = mocker.Mock()
+    process_github_webhook.github_app_api.requester.graphql_query.side_effect = GithubException(
+        400,
+        {
+            "data": {"check0": {"checkRun": {"id": 1}}, "check1": None, "check2": {"checkRun": {"id": 3}}},
+            "errors": [{}],
+        },
+    )
+
+    process_github_webhook.set_check_runs_queued()
+
+    repository_by_github_app.create_check_run.assert_called_once_with(name="tox", head_sha="abc", status="queued")
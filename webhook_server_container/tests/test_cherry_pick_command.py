@@ -0,0 +1,19 @@
+def test_process_cherry_pick_command_skip_missing_branches(process_github_webhook, mocker):
+    def _get_branch(branch):
+        if branch == "missing":
+            raise Exception("Branch not found")
+
+    process_github_webhook.repository = mocker.Mock()
+    process_github_webhook.repository.get_branch.side_effect = _get_branch
+    process_github_webhook.pull_request = mocker.Mock()
+    process_github_webhook.pull_request.is_merged.return_value = True
+    cherry_pick = mocker.patch.object(process_github_webhook, "cherry_pick")
+
+    process_github_webhook.process_cherry_pick_command(
+        issue_comment_id=1, command_args="v1.0 missing", reviewed_user="user1"
+    )
+
+    cherry_pick.assert_called_once_with(target_branch="v1.0", reviewed_user="user1")
+    process_github_webhook.pull_request.create_issue_comment.assert_called_once_with(
+        "Target branch `missing` does not exist\n"
+    )
@@ -0,0 +1,17 @@
+def test_close_issue_without_assignee(process_github_webhook, mocker):
+    process_github_webhook.pull_request = mocker.Mock(number=5, title="Fix", user=mocker.Mock(login="fork-user"))
+    # Search matches words, an issue of another pull request whose body has the same words is skipped
+    other_issue = mocker.Mock(body="[Auto generated]\nNumber: [#5] Number: [#50]", assignee=None)
+    pull_request_issue = mocker.Mock(body="[Auto generated]\nNumber: [#5]", assignee=None)
+    process_github_webhook.github_api = mocker.Mock()
+    process_github_webhook.github_api.search_issues.return_value = [other_issue, pull_request_issue]
+    process_github_webhook.repository = mocker.Mock()
+
+    process_github_webhook.close_issue_for_merged_or_closed_pr(hook_action="closed")
+
+    process_github_webhook.github_api.search_issues.assert_called_once_with(
+        query=f'"Number: [#5]" in:body is:issue is:open repo:{process_github_webhook.repository_full_name}'
+    )
+    process_github_webhook.repository.get_issues.assert_not_called()
+    pull_request_issue.edit.assert_called_once_with(state="closed")
+    other_issue.edit.assert_not_called()
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+import yaml
+
+from webhook_server_container.libs.config import Config, _load_config_data
+
+
+def test_config_data_parsed_once_per_mtime(mocker):
+    os.environ["WEBHOOK_SERVER_DATA_DIR"] = "webhook_server_container/tests/manifests"
+    _load_config_data.cache_clear()
+    load_spy = mocker.spy(yaml, "load")
+
+    config = Config()
+    first = config.data
+    with pytest.raises(TypeError):
+        first["repositories"] = {}
+
+    assert config.data["repositories"]
+    assert load_spy.call_count == 1
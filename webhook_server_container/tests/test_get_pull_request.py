@@ -0,0 +1,54 @@
+from github import GithubException
+
+
+def test_get_pull_request_from_issue_comment(process_github_webhook, mocker):
+    repository = mocker.Mock()
+    process_github_webhook.repository = repository
+    process_github_webhook.hook_data = {
+        "comment": {"id": 1},
+        "issue": {"number": 5, "pull_request": {"url": "https://api.github.com/repos/org/repo/pulls/5"}},
+        "repository": {"id": 2},
+    }
+
+    assert process_github_webhook._get_pull_request() is repository.get_pull.return_value
+    repository.get_pull.assert_called_once_with(5)
+
+
+def test_check_run_pull_request_from_head_commit(process_github_webhook, mocker):
+    check_if_can_be_merged = mocker.patch.object(process_github_webhook, "check_if_can_be_merged")
+    open_pull_request = mocker.Mock(state="open", head=mocker.Mock(sha="abc"))
+    head_commit = mocker.Mock()
+    head_commit.get_pulls.return_value = [mocker.Mock(state="closed", head=mocker.Mock(sha="abc")), open_pull_request]
+    repository = mocker.Mock()
+    repository.get_commit.return_value = head_commit
+    process_github_webhook.repository = repository
+    process_github_webhook.pull_request = None
+    process_github_webhook.hook_data = {
+        "action": "completed",
+        "check_run": {"name": "tox", "status": "completed", "conclusion": "success", "head_sha": "abc"},
+    }
+
+    process_github_webhook.process_pull_request_check_run_webhook_data()
+    repository.get_commit.assert_called_once_with(sha="abc")
+    repository.get_pulls.assert_not_called()
+    assert process_github_webhook.pull_request is open_pull_request
+    assert process_github_webhook.last_commit is head_commit
+    check_if_can_be_merged.assert_called_once()
+
+
+def test_get_pull_request_fallback_skips_tried_number(process_github_webhook, mocker):
+    def _get_pull(number):
+        if number != 7:
+            raise GithubException(404)
+
+        return mocker.Mock(number=number)
+
+    repository = mocker.Mock()
+    repository.get_pull.side_effect = _get_pull
+    process_github_webhook.repository = repository
+    process_github_webhook.hook_data = {
+        "pull_request": {"number": 5, "head": {"repo": {"number": 7}}},
+    }
+
+    assert process_github_webhook._get_pull_request().number == 7
+    assert [_call.args[0] for _call in repository.get_pull.call_args_list] == [5, 7]
@@ -0,0 +1,73 @@
+import os
+
+from github.GithubException import UnknownObjectException
+
+from webhook_server_container.libs.config import Config
+from webhook_server_container.utils.github_repository_settings import (
+    _get_github_repo_api,
+    get_repository_github_app_api,
+    get_required_status_checks,
+    set_repository,
+)
+
+
+def test_get_required_status_checks():
+    required_status_checks = get_required_status_checks(
+        data={"tox": True, "container": True},
+        default_status_checks=["can-be-merged", "tox"],
+        exclude_status_checks=["verified", "build-container"],
+        pre_commit_config_exists=True,
+    )
+    assert required_status_checks == ["can-be-merged", "tox", "pre-commit.ci - pr"]
+
+
+def test_set_repository_failed_branch_protection(mocker):
+    os.environ["WEBHOOK_SERVER_DATA_DIR"] = "webhook_server_container/tests/manifests"
+    base_import_path = "webhook_server_container.utils.github_repository_settings"
+    mocker.patch(f"{base_import_path}.get_logger_with_params")
+    mocker.patch(f"{base_import_path}.set_repository_labels")
+    mocker.patch(f"{base_import_path}.set_repository_settings")
+    mocker.patch(f"{base_import_path}.has_pre_commit_config", return_value=False)
+    mocker.patch(
+        f"{base_import_path}.set_branch_protection",
+        side_effect=lambda branch_name, **kwargs: branch_name == "main",
+    )
+    github_api = mocker.Mock()
+    github_api.get_repo.return_value.private = False
+
+    success, msg, _ = set_repository(
+        data={"name": "my-org/test-repo", "protected-branches": {"main": [], "missing-branch": []}},
+        github_api=github_api,
+        default_status_checks=["can-be-merged"],
+        api_user="my[bot]",
+    )
+    assert not success
+    assert "missing-branch" in msg
+    assert "'main'" not in msg
+
+
+def test_get_repository_github_app_api_reuse_client(mocker):
+    os.environ["WEBHOOK_SERVER_DATA_DIR"] = "webhook_server_container/tests/manifests"
+    base_import_path = "webhook_server_container.utils.github_repository_settings"
+    mocker.patch(f"{base_import_path}.get_logger_with_params")
+    mocker.patch(f"{base_import_path}.os.path.getmtime", return_value=0)
+    app_instance = mocker.Mock()
+    mocker.patch(f"{base_import_path}._get_github_integration", return_value=app_instance)
+
+    config = Config()
+    app_api = get_repository_github_app_api(config_=config, repository_name="my-org/test-repo")
+    assert get_repository_github_app_api(config_=config, repository_name="my-org/test-repo") is app_api
+    app_instance.get_repo_installation.assert_called_once_with(owner="my-org", repo="test-repo")
+
+
+def test_get_github_repo_api_not_cache_missing_repository(mocker):
+    base_import_path = "webhook_server_container.utils.github_repository_settings"
+    mocker.patch(f"{base_import_path}.get_logger_with_params")
+    repo = mocker.Mock()
+    github_api = mocker.Mock()
+    github_api.get_repo.side_effect = [UnknownObjectException(404), repo, mocker.Mock()]
+
+    assert _get_github_repo_api(github_api=github_api, repository="my-org/new-repo") is None
+    assert _get_github_repo_api(github_api=github_api, repository="my-org/new-repo") is repo
+    assert _get_github_repo_api(github_api=github_api, repository="my-org/new-repo") is repo
+    assert github_api.get_repo.call_count == 2
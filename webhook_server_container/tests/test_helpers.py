@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from webhook_server_container.utils.helpers import (
+    extract_key_from_dict,
+    get_api_user_login,
+    get_future_results,
+    get_github_api_for_token,
+    get_rate_limit,
+    run_command,
+)
+
+
+def test_get_github_api_for_token_reuse_instance():
+    assert get_github_api_for_token(token="token1") is get_github_api_for_token(token="token1")
+    assert get_github_api_for_token(token="token1") is not get_github_api_for_token(token="token2")
+
+
+def test_get_future_results_continue_after_exception(mocker):
+    mocker.patch("webhook_server_container.utils.helpers.get_logger_with_params")
+
+    def _raise():
+        raise ValueError("failed")
+
+    success_log = mocker.Mock()
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(_raise), executor.submit(lambda: (True, "done", success_log))]
+
+    get_future_results(futures=futures)
+    success_log.assert_called_once_with("done")
+
+
+def test_get_api_user_login_once_per_token(mocker):
+    get_api = mocker.patch("webhook_server_container.utils.helpers.get_github_api_for_token")
+    get_api.return_value.get_user.return_value.login = "api-user"
+
+    assert get_api_user_login(token="login-token") == "api-user"
+    assert get_api_user_login(token="login-token") == "api-user"
+    get_api.return_value.get_user.assert_called_once()
+
+
+def test_extract_key_from_dict_top_level_first():
+    hook_data = {
+        "check_run": {"id": 1, "pull_requests": [{"number": 3}, {"number": 4}]},
+        "review": {"user": {"number": 2}},
+        "number": 1,
+    }
+
+    assert list(extract_key_from_dict(key="number", _dict=hook_data)) == [1, 2, 3, 4]
+
+
+def test_get_rate_limit_cache(mocker):
+    github_api = mocker.Mock()
+
+    assert get_rate_limit(github_api=github_api, token="rate-limit-token") is github_api.get_rate_limit.return_value
+    assert get_rate_limit(github_api=github_api, token="rate-limit-token") is github_api.get_rate_limit.return_value
+    github_api.get_rate_limit.assert_called_once()
+
+
+def test_run_command_output_max_size(mocker):
+    mocker.patch("webhook_server_container.utils.helpers.get_logger_with_params")
+
+    rc, out, err = run_command(
+        command='python -c \'import sys; print("a" * 100 + "end"); print("error", file=sys.stderr)\'',
+        log_prefix="test",
+        output_max_size=4,
+    )
+    assert rc
+    assert out == "end\n"
+    assert err == "ror\n"
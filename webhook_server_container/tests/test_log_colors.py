@@ -0,0 +1,16 @@
+import os
+
+from webhook_server_container.libs.github_api import ProcessGithubWehook
+
+
+def test_log_colors_written_only_on_change(process_github_webhook, mocker, tmp_path):
+    process_github_webhook.config.data_dir = str(tmp_path)
+    mocker.patch.object(ProcessGithubWehook, "_log_colors", {})
+    replace_mock = mocker.spy(os, "replace")
+
+    process_github_webhook._get_reposiroty_color_for_log_prefix()
+    process_github_webhook._get_reposiroty_color_for_log_prefix()
+
+    assert replace_mock.call_count == 1
+    assert "test-repo" in ProcessGithubWehook._log_colors
+    assert os.path.exists(os.path.join(tmp_path, "log-colors.json"))
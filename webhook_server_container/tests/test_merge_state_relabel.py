@@ -0,0 +1,53 @@
+from webhook_server_container.libs.github_api import (
+    _relabel_opened_pull_requests_by_merge_state,
+    schedule_merge_state_relabel,
+)
+
+
+class Label:
+    def __init__(self, name: str):
+        self.name = name
+
+
+def test_schedule_merge_state_relabel_once_per_repository(mocker):
+    base_import_path = "webhook_server_container.libs.github_api"
+    relabel_due = mocker.patch.dict(f"{base_import_path}._MERGE_STATE_RELABEL_DUE", clear=True)
+    executor = mocker.patch(f"{base_import_path}._MERGE_STATE_RELABEL_EXECUTOR")
+    github_api = mocker.Mock()
+
+    schedule_merge_state_relabel(
+        github_api=github_api, repository_full_name="org/repo", logger=mocker.Mock(), log_prefix=""
+    )
+    first_due = relabel_due["org/repo"]
+    schedule_merge_state_relabel(
+        github_api=github_api, repository_full_name="org/repo", logger=mocker.Mock(), log_prefix=""
+    )
+    schedule_merge_state_relabel(
+        github_api=github_api, repository_full_name="org/other", logger=mocker.Mock(), log_prefix=""
+    )
+
+    assert executor.submit.call_count == 2
+    assert relabel_due["org/repo"] >= first_due
+    github_api.get_repo.assert_not_called()
+
+
+def test_relabel_opened_pull_requests_by_merge_state(mocker):
+    mocker.patch.dict(
+        "webhook_server_container.libs.github_api._MERGE_STATE_RELABEL_DUE", {"org/repo": 0.0}, clear=True
+    )
+    behind = mocker.Mock(number=1, mergeable_state="behind", labels=[Label("has-conflicts")])
+    clean = mocker.Mock(number=2, mergeable_state="clean", labels=[Label("needs-rebase")])
+    unknown = mocker.Mock(number=3, mergeable_state="unknown", labels=[Label("needs-rebase")])
+    github_api = mocker.Mock()
+    github_api.get_repo.return_value.get_pulls.return_value = [behind, clean, unknown]
+
+    _relabel_opened_pull_requests_by_merge_state(
+        github_api=github_api, repository_full_name="org/repo", logger=mocker.Mock(), log_prefix=""
+    )
+
+    github_api.get_repo.assert_called_once_with("org/repo")
+    behind.add_to_labels.assert_called_once_with("needs-rebase")
+    behind.remove_from_labels.assert_called_once_with("has-conflicts")
+    clean.remove_from_labels.assert_called_once_with("needs-rebase")
+    clean.add_to_labels.assert_not_called()
+    unknown.remove_from_labels.assert_not_called()
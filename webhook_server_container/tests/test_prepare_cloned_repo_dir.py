@@ -0,0 +1,56 @@
+def _run_commands(run_command):
+    return [_call.kwargs.get("command", _call.args[0] if _call.args else "") for _call in run_command.call_args_list]
+
+
+def test_prepare_cloned_repo_dir_mirror_clone_failed(process_github_webhook, mocker):
+    run_command = mocker.patch(
+        "webhook_server_container.libs.github_api.run_command",
+        side_effect=lambda command, **_: (not command.startswith("git clone --bare"), "", ""),
+    )
+    process_github_webhook.repository = mocker.Mock(clone_url="https://github.com/org/repo.git")
+    process_github_webhook.token = "TOKEN"
+    process_github_webhook._use_repository_mirror = True
+
+    with process_github_webhook._prepare_cloned_repo_dir(clone_repo_dir="/tmp/clone", checkout="main"):
+        pass
+
+    with process_github_webhook._prepare_cloned_repo_dir(clone_repo_dir="/tmp/clone2", checkout="main"):
+        pass
+
+    commands = _run_commands(run_command=run_command)
+    assert commands[1] == "git clone https://TOKEN@github.com/org/repo.git /tmp/clone"
+    assert "git clone https://TOKEN@github.com/org/repo.git /tmp/clone2" in commands
+    assert len([_command for _command in commands if _command.startswith("git clone --bare")]) == 1
+    assert not process_github_webhook._repository_mirror_dir
+    assert not any("remote set-url" in _command for _command in commands)
+
+
+def test_prepare_cloned_repo_dir_from_mirror(process_github_webhook, mocker):
+    run_command = mocker.patch("webhook_server_container.libs.github_api.run_command", return_value=(True, "", ""))
+    process_github_webhook.repository = mocker.Mock(clone_url="https://github.com/org/repo.git")
+    process_github_webhook.token = "TOKEN"
+    process_github_webhook._use_repository_mirror = True
+
+    with process_github_webhook._prepare_cloned_repo_dir(clone_repo_dir="/tmp/clone", checkout="main"):
+        pass
+
+    commands = _run_commands(run_command=run_command)
+    mirror_dir = process_github_webhook._repository_mirror_dir
+    assert commands[0] == f"git clone --bare https://TOKEN@github.com/org/repo.git {mirror_dir}"
+    assert commands[1] == f"git clone {mirror_dir} /tmp/clone"
+    assert commands.index(
+        "git --work-tree=/tmp/clone --git-dir=/tmp/clone/.git remote set-url origin https://TOKEN@github.com/org/repo.git"
+    ) < commands.index("git --work-tree=/tmp/clone --git-dir=/tmp/clone/.git remote update")
+
+
+def test_prepare_cloned_repo_dir_single_check_no_mirror(process_github_webhook, mocker):
+    run_command = mocker.patch("webhook_server_container.libs.github_api.run_command", return_value=(True, "", ""))
+    process_github_webhook.repository = mocker.Mock(clone_url="https://github.com/org/repo.git")
+    process_github_webhook.token = "TOKEN"
+
+    with process_github_webhook._prepare_cloned_repo_dir(clone_repo_dir="/tmp/clone", checkout="main"):
+        pass
+
+    commands = _run_commands(run_command=run_command)
+    assert commands[0] == "git clone https://TOKEN@github.com/org/repo.git /tmp/clone"
+    assert not process_github_webhook._repository_mirror_dir
@@ -0,0 +1,185 @@
+from github.GithubException import UnknownObjectException
+
+from webhook_server_container.libs.github_api import REPOSITORY_LABELS_COLORS_TTL
+
+
+class Label:
+    def __init__(self, name: str):
+        self.name = name
+
+
+def test_pull_request_labels_cache(process_github_webhook, mocker):
+    pull_request = mocker.Mock(number=1, labels=[Label("hold"), Label("wip")])
+    pull_request.get_labels.return_value = [Label("wip")]
+    process_github_webhook.pull_request = pull_request
+
+    assert process_github_webhook.label_exists_in_pull_request(label="hold")
+    assert process_github_webhook._remove_label(label="hold")
+    pull_request.remove_from_labels.assert_called_once_with("hold")
+    pull_request.get_labels.assert_called_once()
+    assert sorted(process_github_webhook.pull_request_labels_names()) == ["wip"]
+
+    process_github_webhook._add_label(label="verified")
+    pull_request.add_to_labels.assert_called_once_with("verified")
+    assert process_github_webhook.label_exists_in_pull_request(label="verified")
+    pull_request.get_labels.assert_called_once()
+
+
+def test_pull_request_labels_refresh_keeps_pending_changes(process_github_webhook, mocker):
+    pull_request = mocker.Mock(number=1, labels=[Label("hold")])
+    pull_request.get_labels.return_value = [Label("hold")]
+    process_github_webhook.pull_request = pull_request
+
+    process_github_webhook._add_label(label="verified")
+    process_github_webhook._set_pull_request_label_cache(label="hold", exists=False)
+    assert sorted(process_github_webhook.pull_request_labels_names(refresh=True)) == ["verified"]
+
+    pull_request.get_labels.return_value = [Label("hold"), Label("verified")]
+    assert sorted(process_github_webhook.pull_request_labels_names(refresh=True)) == ["verified"]
+    assert process_github_webhook._pull_request_labels_changes[1] == {"hold": False}
+
+    pull_request.get_labels.return_value = [Label("verified")]
+    assert process_github_webhook.pull_request_labels_names(refresh=True) == ["verified"]
+    assert process_github_webhook._pull_request_labels_changes[1] == {}
+
+
+def test_wait_for_label_backoff(process_github_webhook, mocker):
+    sleep_mock = mocker.patch("webhook_server_container.libs.github_api.time.sleep")
+    pull_request = mocker.Mock(number=1, labels=[])
+    pull_request.get_labels.side_effect = [[], [], [Label("verified")]]
+    process_github_webhook.pull_request = pull_request
+
+    assert process_github_webhook.wait_for_label(label="verified", exists=True)
+    assert [_call.args[0] for _call in sleep_mock.call_args_list] == [1, 2]
+
+
+def test_add_dynamic_label_repository_labels_cache(process_github_webhook, mocker):
+    mocker.patch.dict("webhook_server_container.libs.github_api._REPOSITORY_LABELS_COLORS", clear=True)
+    mocker.patch.object(process_github_webhook, "wait_for_label")
+    repository = mocker.Mock()
+    repository.get_labels.return_value = [mocker.Mock(color="0e8a16"), mocker.Mock(color="ededed")]
+    repository.get_labels.return_value[0].name = "approved-user1"
+    repository.get_labels.return_value[1].name = "lgtm-user1"
+    process_github_webhook.repository = repository
+    process_github_webhook.pull_request = mocker.Mock(number=1, labels=[])
+
+    process_github_webhook._add_label(label="approved-user1")
+    repository.create_label.assert_not_called()
+    repository.get_label.assert_not_called()
+
+    process_github_webhook._add_label(label="lgtm-user1")
+    repository.get_label.assert_called_once_with("lgtm-user1")
+    repository.get_label.return_value.edit.assert_called_once_with(
+        name=repository.get_label.return_value.name, color="DCED6F"
+    )
+
+    process_github_webhook._add_label(label="commented-user1")
+    repository.create_label.assert_called_once_with(name="commented-user1", color="D93F0B")
+
+    process_github_webhook._add_label(label="commented-user2")
+    repository.get_labels.assert_called_once()
+
+
+def test_add_dynamic_label_repository_labels_cache_expire(process_github_webhook, mocker):
+    labels_colors_cache = mocker.patch.dict(
+        "webhook_server_container.libs.github_api._REPOSITORY_LABELS_COLORS", clear=True
+    )
+    mocker.patch.object(process_github_webhook, "wait_for_label")
+    repository = mocker.Mock()
+    repository.get_labels.return_value = [mocker.Mock(color="ededed")]
+    repository.get_labels.return_value[0].name = "lgtm-user1"
+    repository.get_label.side_effect = UnknownObjectException(404)
+    process_github_webhook.repository = repository
+    process_github_webhook.pull_request = mocker.Mock(number=1, labels=[])
+
+    # Deleted outside the server, GitHub disagrees with the cache so it is dropped
+    process_github_webhook._add_label(label="lgtm-user1")
+    repository.create_label.assert_called_once_with(name="lgtm-user1", color="DCED6F")
+    assert process_github_webhook.repository_full_name not in labels_colors_cache
+
+    process_github_webhook._add_label(label="commented-user1")
+    assert repository.get_labels.call_count == 2
+
+    _timestamp, _labels_colors = labels_colors_cache[process_github_webhook.repository_full_name]
+    labels_colors_cache[process_github_webhook.repository_full_name] = (
+        _timestamp - REPOSITORY_LABELS_COLORS_TTL,
+        _labels_colors,
+    )
+    process_github_webhook._add_label(label="commented-user2")
+    assert repository.get_labels.call_count == 3
+
+
+def test_remove_labels_when_pull_request_sync(process_github_webhook, mocker):
+    pull_request = mocker.Mock(
+        number=1, labels=[Label("approved-user1"), Label("lgtm-user2"), Label("size/M"), Label("verified")]
+    )
+    process_github_webhook.pull_request = pull_request
+
+    mocker.patch.object(process_github_webhook, "wait_for_label", return_value=True)
+
+    process_github_webhook.remove_labels_when_pull_request_sync()
+    pull_request.set_labels.assert_not_called()
+    assert sorted(_call.args[0] for _call in pull_request.remove_from_labels.call_args_list) == [
+        "approved-user1",
+        "lgtm-user2",
+    ]
+    assert sorted(process_github_webhook.pull_request_labels_names()) == ["size/M", "verified"]
+
+
+def test_classify_labels(process_github_webhook):
+    labels = ["approved-user1", "changes-requested-user2", "lgtm-user3", "hold", "cherry-pick-v1.0", "size/M"]
+    classified_labels = process_github_webhook._classify_labels(labels=labels)
+    assert classified_labels == {
+        "names": frozenset(labels),
+        "approvers": {"user1"},
+        "change_requesters": {"user2"},
+        "lgtm": {"user3"},
+        "has_hold": True,
+        "has_wip": False,
+        "cherry_pick_targets": ["v1.0"],
+    }
+
+
+def test_check_lables_for_can_be_merged(process_github_webhook):
+    process_github_webhook.all_approvers = ["user1", "user2"]
+    process_github_webhook.can_be_merged_required_labels = ["verified", "lgtm"]
+
+    assert (
+        process_github_webhook._check_lables_for_can_be_merged(
+            labels=["changes-requested-user1", "changes-requested-user2", "verified"]
+        )
+        == "PR has changed requests from approvers\nMissing required labels: lgtm\n"
+    )
+
+
+def test_user_commands_run_in_comment_order(process_github_webhook, mocker):
+    user_commands = mocker.patch.object(process_github_webhook, "user_commands")
+    process_github_webhook.pull_request = mocker.Mock(number=1, labels=[])
+    process_github_webhook.hook_data = {
+        "action": "created",
+        "issue": {"number": 1},
+        "comment": {"body": "/verified\n/retest tox\n/check-can-merge\n/hold\n/hold cancel", "id": 1},
+        "sender": {"login": "user1"},
+    }
+
+    process_github_webhook.process_comment_webhook_data()
+
+    assert [_call.kwargs["command"] for _call in user_commands.call_args_list] == [
+        "verified",
+        "retest tox",
+        "check-can-merge",
+        "hold",
+        "hold cancel",
+    ]
+
+
+def test_user_commands_dispatch_keyword_arguments(process_github_webhook, mocker):
+    mocker.patch.object(process_github_webhook, "create_comment_reaction")
+    hold_handler = mocker.patch.object(process_github_webhook, "_handle_hold_command")
+    retest_handler = mocker.patch.object(process_github_webhook, "_handle_retest_command")
+
+    process_github_webhook.user_commands(command="hold cancel", reviewed_user="user1", issue_comment_id=1)
+    process_github_webhook.user_commands(command="retest tox", reviewed_user="user1", issue_comment_id=2)
+
+    hold_handler.assert_called_once_with(command_args="cancel", remove=True, reviewed_user="user1", issue_comment_id=1)
+    retest_handler.assert_called_once_with(command_args="tox", remove=False, reviewed_user="user1", issue_comment_id=2)
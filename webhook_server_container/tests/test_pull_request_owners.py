@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import pytest
 
 import yaml
@@ -12,7 +14,7 @@ class Repository:
     def get_git_tree(self, sha: str, recursive: bool):
         return Tree("")
 
-    def get_contents(self, path: str):
+    def get_contents(self, path: str, ref: str = ""):
         owners_data = yaml.dump({
             "approvers": ["root_approver1", "root_approver2"],
             "reviewers": ["root_reviewer1", "root_reviewer2"],
@@ -108,6 +110,34 @@ def test_get_all_approvers_and_reviewers(process_github_webhook, all_approvers_a
     assert read_owners_result == process_github_webhook.all_approvers_and_reviewers
 
 
+def test_get_all_approvers_and_reviewers_cached_by_sha(mocker, process_github_webhook, all_approvers_and_reviewers):
+    mocker.patch("webhook_server_container.libs.github_api._OWNERS_CONTENT_CACHE", OrderedDict())
+    owners_tree_cache = mocker.patch("webhook_server_container.libs.github_api._OWNERS_TREE_CACHE", OrderedDict())
+    process_github_webhook.repository = Repository()
+    get_contents_spy = mocker.spy(process_github_webhook.repository, "get_contents")
+
+    process_github_webhook.get_all_approvers_and_reviewers()
+    owners_tree_cache.clear()
+    read_owners_result = process_github_webhook.get_all_approvers_and_reviewers()
+
+    assert read_owners_result == process_github_webhook.all_approvers_and_reviewers
+    assert get_contents_spy.call_count == 5
+
+
+def test_get_all_approvers_and_reviewers_cached_by_tree_sha(
+    mocker, process_github_webhook, all_approvers_and_reviewers
+):
+    mocker.patch("webhook_server_container.libs.github_api._OWNERS_CONTENT_CACHE", OrderedDict())
+    mocker.patch("webhook_server_container.libs.github_api._OWNERS_TREE_CACHE", OrderedDict())
+    process_github_webhook.repository = Repository()
+    get_contents_spy = mocker.spy(process_github_webhook.repository, "get_contents")
+
+    first_result = process_github_webhook.get_all_approvers_and_reviewers()
+    assert process_github_webhook.get_all_approvers_and_reviewers() is first_result
+    assert first_result == process_github_webhook.all_approvers_and_reviewers
+    assert get_contents_spy.call_count == 5
+
+
 def test_owners_data_for_changed_files(process_github_webhook, all_approvers_and_reviewers):
     owners_data_chaged_files_result = process_github_webhook.owners_data_for_changed_files()
     owners_data_chaged_files_expected = {
@@ -0,0 +1,35 @@
+def test_branch_required_status_checks_cache(process_github_webhook, mocker):
+    mocker.patch.dict(
+        "webhook_server_container.libs.github_api._BRANCH_REQUIRED_STATUS_CHECKS_CACHE",
+        clear=True,
+    )
+    repository = mocker.Mock(private=False)
+    repository.get_branch.return_value.get_protection.return_value.required_status_checks.contexts = ["tox"]
+    process_github_webhook.repository = repository
+    process_github_webhook.pull_request_branch = "main"
+
+    assert process_github_webhook.get_branch_required_status_checks() == ["tox"]
+    assert process_github_webhook.get_branch_required_status_checks() == ["tox"]
+    repository.get_branch.assert_called_once_with("main")
+
+
+def test_required_check_runs_in_progress_and_failed(process_github_webhook, mocker):
+    def _check_run(name, status, conclusion=None):
+        check_run = mocker.Mock(status=status, conclusion=conclusion)
+        check_run.name = name
+        return check_run
+
+    process_github_webhook.all_required_status_checks = ["tox", "pre-commit", "build-container", "verified"]
+    check_runs = [
+        _check_run(name="tox", status="in_progress"),
+        _check_run(name="tox", status="completed", conclusion="failure"),
+        _check_run(name="pre-commit", status="completed", conclusion="failure"),
+        _check_run(name="build-container", status="completed", conclusion="success"),
+        _check_run(name="not-required", status="completed", conclusion="failure"),
+        _check_run(name="can-be-merged", status="completed", conclusion="failure"),
+    ]
+
+    assert process_github_webhook._required_check_runs_in_progress_and_failed(last_commit_check_runs=check_runs) == (
+        ["tox"],
+        ["pre-commit"],
+    )
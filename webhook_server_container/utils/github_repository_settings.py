@@ -1,11 +1,12 @@
 import contextlib
+import functools
 import os
+import threading
 from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from copy import deepcopy
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import github
-from github import Auth, Github, GithubIntegration
+from github import Auth, Github, GithubIntegration, GithubRetry
 from github.Auth import AppAuth
 from github.Branch import Branch
 from github.Commit import Commit
@@ -25,47 +26,88 @@ from webhook_server_container.utils.constants import (
     TOX_STR,
 )
 from webhook_server_container.utils.helpers import (
+    GITHUB_API_PER_PAGE,
+    GITHUB_API_POOL_SIZE,
     get_api_with_highest_rate_limit,
     get_future_results,
     get_logger_with_params,
+    run_command,
 )
 
+# Repositories and their protected branches are processed in nested pools, bound both levels to keep
+# the number of concurrent GitHub API calls (repositories * branches) under control
+REPOSITORIES_MAX_WORKERS: int = 10
+BRANCHES_MAX_WORKERS: int = 5
+
+# GitHub secondary rate limits are triggered by too many concurrent write requests from one token
+GITHUB_MAX_CONCURRENT_WRITES: int = 20
+_GITHUB_WRITES_SEMAPHORE = threading.BoundedSemaphore(GITHUB_MAX_CONCURRENT_WRITES)
+
+# App installation clients by (integration, repository). A shared client reuses its connection pool, refreshes
+# its installation token by itself and paces requests (seconds_between_requests/writes) across concurrent webhooks
+_REPOSITORIES_APP_API: Dict[Tuple[GithubIntegration, str], Github] = {}
+_REPOSITORIES_APP_API_LOCK = threading.Lock()
+
+
+# Repositories are resolved again (same client) when setting check runs to queued, share the lookups.
+# Only found repositories are kept, a missing one (not created yet, app not installed) is looked up again next time
+_GITHUB_REPOS_API: Dict[Tuple[github.Github, int | str], Repository] = {}
+_GITHUB_REPOS_API_LOCK = threading.Lock()
+
 
 def _get_github_repo_api(github_api: github.Github, repository: int | str) -> Repository | None:
+    with _GITHUB_REPOS_API_LOCK:
+        repo = _GITHUB_REPOS_API.get((github_api, repository))
+    if repo:
+        return repo
+
     logger = get_logger_with_params(name="github-repository-settings")
     try:
-        return github_api.get_repo(repository)
+        repo = github_api.get_repo(repository)
     except UnknownObjectException:
         logger.error(f"Failed to get GitHub API for repository {repository}")
         return None
 
+    with _GITHUB_REPOS_API_LOCK:
+        return _GITHUB_REPOS_API.setdefault((github_api, repository), repo)
 
-def get_branch_sampler(repo: Repository, branch_name: str) -> Branch:
-    return repo.get_branch(branch=branch_name)
+
+def get_branch_sampler(repo: Repository, branch_name: str) -> Branch | None:
+    # Transient errors (5xx, rate limits) are retried with backoff by the client's GithubRetry
+    try:
+        return repo.get_branch(branch=branch_name)
+    except UnknownObjectException:
+        return None
 
 
 def set_branch_protection(
-    branch: Branch,
+    branch_name: str,
     repository: Repository,
     required_status_checks: List[str],
-    github_api: Github,
+    api_user: str,
 ) -> bool:
     logger = get_logger_with_params(name="github-repository-settings")
 
-    api_user = github_api.get_user().login
+    logger.debug(f"{repository.name}: Getting branch {branch_name}")
+    branch = get_branch_sampler(repo=repository, branch_name=branch_name)
+    if not branch:
+        logger.error(f"{repository.name}: Failed to get branch {branch_name}")
+        return False
+
     logger.info(f"Set branch {branch} setting for {repository.name}. enabled checks: {required_status_checks}")
-    branch.edit_protection(
-        strict=True,
-        required_conversation_resolution=True,
-        contexts=required_status_checks,
-        require_code_owner_reviews=False,
-        dismiss_stale_reviews=True,
-        required_approving_review_count=0,
-        required_linear_history=True,
-        users_bypass_pull_request_allowances=[api_user],
-        teams_bypass_pull_request_allowances=[api_user],
-        apps_bypass_pull_request_allowances=[api_user],
-    )
+    with _GITHUB_WRITES_SEMAPHORE:
+        branch.edit_protection(
+            strict=True,
+            required_conversation_resolution=True,
+            contexts=required_status_checks,
+            require_code_owner_reviews=False,
+            dismiss_stale_reviews=True,
+            required_approving_review_count=0,
+            required_linear_history=True,
+            users_bypass_pull_request_allowances=[api_user],
+            teams_bypass_pull_request_allowances=[api_user],
+            apps_bypass_pull_request_allowances=[api_user],
+        )
 
     return True
 
@@ -74,36 +116,47 @@ def set_repository_settings(repository: Repository) -> None:
     logger = get_logger_with_params(name="github-repository-settings")
 
     logger.info(f"Set repository {repository.name} settings")
-    repository.edit(delete_branch_on_merge=True, allow_auto_merge=True, allow_update_branch=True)
+    with _GITHUB_WRITES_SEMAPHORE:
+        repository.edit(delete_branch_on_merge=True, allow_auto_merge=True, allow_update_branch=True)
 
     if repository.private:
         logger.warning(f"{repository.name}: Repository is private, skipping setting security settings")
         return
 
     logger.info(f"Set repository {repository.name} security settings")
-    repository._requester.requestJsonAndCheck(
-        "PATCH",
-        f"{repository.url}/code-scanning/default-setup",
-        input={"state": "not-configured"},
-    )
+    with _GITHUB_WRITES_SEMAPHORE:
+        repository._requester.requestJsonAndCheck(
+            "PATCH",
+            f"{repository.url}/code-scanning/default-setup",
+            input={"state": "not-configured"},
+        )
 
-    repository._requester.requestJsonAndCheck(
-        "PATCH",
-        repository.url,
-        input={
-            "security_and_analysis": {
-                "secret_scanning": {"status": "enabled"},
-                "secret_scanning_push_protection": {"status": "enabled"},
-            }
-        },
-    )
+    with _GITHUB_WRITES_SEMAPHORE:
+        repository._requester.requestJsonAndCheck(
+            "PATCH",
+            repository.url,
+            input={
+                "security_and_analysis": {
+                    "secret_scanning": {"status": "enabled"},
+                    "secret_scanning_push_protection": {"status": "enabled"},
+                }
+            },
+        )
+
+
+def has_pre_commit_config(repo: Repository) -> bool:
+    with contextlib.suppress(Exception):
+        repo.get_contents(".pre-commit-config.yaml")
+        return True
+
+    return False
 
 
 def get_required_status_checks(
-    repo: Repository,
     data: Dict[str, Any],
     default_status_checks: List[str],
     exclude_status_checks: List[str],
+    pre_commit_config_exists: bool,
 ) -> List[str]:
     if data.get("tox"):
         default_status_checks.append("tox")
@@ -120,15 +173,16 @@ def get_required_status_checks(
     if data.get("pre-commit"):
         default_status_checks.append(PRE_COMMIT_STR)
 
-    with contextlib.suppress(Exception):
-        repo.get_contents(".pre-commit-config.yaml")
+    if pre_commit_config_exists:
         default_status_checks.append("pre-commit.ci - pr")
 
-    for status_check in exclude_status_checks:
-        if status_check in default_status_checks:
-            default_status_checks.remove(status_check)
-
-    return default_status_checks
+    # Drop duplicates while keeping order, then filter all excluded checks in a single pass
+    _exclude_status_checks = set(exclude_status_checks)
+    return [
+        status_check
+        for status_check in dict.fromkeys(default_status_checks)
+        if status_check not in _exclude_status_checks
+    ]
 
 
 def get_user_configures_status_checks(status_checks: Dict[str, Any]) -> Tuple[List[str], List[str]]:
@@ -160,10 +214,12 @@ def set_repository_labels(repository: Repository) -> str:
                 continue
             else:
                 logger.debug(f"{repository.name}: Edit repository label {label} with color {color}")
-                repo_label.edit(name=repo_label.name, color=color)
+                with _GITHUB_WRITES_SEMAPHORE:
+                    repo_label.edit(name=repo_label.name, color=color)
         else:
             logger.debug(f"{repository.name}: Add repository label {label} with color {color}")
-            repository.create_label(name=label, color=color)
+            with _GITHUB_WRITES_SEMAPHORE:
+                repository.create_label(name=label, color=color)
 
     return f"{repository}: Setting repository labels is done"
 
@@ -181,10 +237,18 @@ def set_repositories_settings(config_: Config, github_api: Github) -> None:
         logger.info("Login in to docker.io")
         docker_username: str = docker["username"]
         docker_password: str = docker["password"]
-        os.system(f"podman login -u {docker_username} -p {docker_password} docker.io")
+        # Pass the password on stdin, no shell and no password in the process list
+        run_command(
+            command=f"podman login -u {docker_username} --password-stdin docker.io",
+            log_prefix="docker.io:",
+            input=docker_password,
+        )
+
+    # Same user for all repositories and branches, resolve it once instead of per branch
+    api_user: str = github_api.get_user().login
 
     futures = []
-    with ThreadPoolExecutor() as executor:
+    with ThreadPoolExecutor(max_workers=REPOSITORIES_MAX_WORKERS) as executor:
         for _, data in config_data["repositories"].items():
             futures.append(
                 executor.submit(
@@ -193,6 +257,7 @@ def set_repositories_settings(config_: Config, github_api: Github) -> None:
                         "data": data,
                         "github_api": github_api,
                         "default_status_checks": default_status_checks,
+                        "api_user": api_user,
                     },
                 )
             )
@@ -201,7 +266,7 @@ def set_repositories_settings(config_: Config, github_api: Github) -> None:
 
 
 def set_repository(
-    data: Dict[str, Any], github_api: Github, default_status_checks: List[str]
+    data: Dict[str, Any], github_api: Github, default_status_checks: List[str], api_user: str
 ) -> Tuple[bool, str, Callable]:
     logger = get_logger_with_params(name="github-repository-settings")
 
@@ -216,47 +281,54 @@ def set_repository(
         set_repository_labels(repository=repo)
         set_repository_settings(repository=repo)
 
+        # Cheap config check first, nothing else below is needed without protected branches
+        if not protected_branches:
+            return True, f"{repository}: No protected branches configured, skipping branch settings", logger.info
+
         if repo.private:
             return False, f"{repository}: Repository is private, skipping setting branch settings", logger.warning
 
-        futures: List["Future"] = []
+        futures: Dict["Future", str] = {}
+        # Same for all branches of the repository, probe once instead of per branch
+        pre_commit_config_exists = has_pre_commit_config(repo=repo)
 
-        with ThreadPoolExecutor() as executor:
+        with ThreadPoolExecutor(max_workers=BRANCHES_MAX_WORKERS) as executor:
             for branch_name, status_checks in protected_branches.items():
-                logger.debug(f"{repository}: Getting branch {branch_name}")
-                branch = get_branch_sampler(repo=repo, branch_name=branch_name)
-                if not branch:
-                    logger.error(f"{repository}: Failed to get branch {branch_name}")
-                    continue
-
-                _default_status_checks = deepcopy(default_status_checks)
+                _default_status_checks = list(default_status_checks)
                 (
                     include_status_checks,
                     exclude_status_checks,
                 ) = get_user_configures_status_checks(status_checks=status_checks)
 
                 required_status_checks = include_status_checks or get_required_status_checks(
-                    repo=repo,
                     data=data,
                     default_status_checks=_default_status_checks,
                     exclude_status_checks=exclude_status_checks,
+                    pre_commit_config_exists=pre_commit_config_exists,
                 )
 
-                futures.append(
-                    executor.submit(
-                        set_branch_protection,
-                        **{
-                            "branch": branch,
-                            "repository": repo,
-                            "required_status_checks": required_status_checks,
-                            "github_api": github_api,
-                        },
-                    )
+                future = executor.submit(
+                    set_branch_protection,
+                    **{
+                        "branch_name": branch_name,
+                        "repository": repo,
+                        "required_status_checks": required_status_checks,
+                        "api_user": api_user,
+                    },
                 )
+                futures[future] = branch_name
 
+        failed_branches: List[str] = []
         for result in as_completed(futures):
             if result.exception():
-                logger.error(result.exception())
+                logger.error(f"{repository}: Failed to set branch {futures[result]} protection: {result.exception()}")
+                failed_branches.append(futures[result])
+
+            elif not result.result():
+                failed_branches.append(futures[result])
+
+        if failed_branches:
+            return False, f"{repository}: Failed to set branch protection for {failed_branches}", logger.error
 
     except UnknownObjectException as ex:
         return False, f"{repository}: Failed to get repository settings, ex: {ex}", logger.error
@@ -313,7 +385,7 @@ def set_repository_check_runs_to_queued(
 
     logger.info(f"{repository}: Set all {IN_PROGRESS_STR} check runs to {QUEUED_STR}")
     for pull_request in repo.get_pulls(state="open"):
-        last_commit: Commit = list(pull_request.get_commits())[-1]
+        last_commit: Commit = repo.get_commit(sha=pull_request.head.sha)
         for check_run in last_commit.get_check_runs():
             if check_run.name in check_runs and check_run.status == IN_PROGRESS_STR:
                 logger.warning(
@@ -325,21 +397,42 @@ def set_repository_check_runs_to_queued(
     return True, f"{repository}: Set check run status to {QUEUED_STR} is done", logger.debug
 
 
+# mtime is part of the cache key so a rotated private key is read again
+@functools.lru_cache(maxsize=4)
+def _get_github_integration(private_key_path: str, private_key_mtime: float, github_app_id: int) -> GithubIntegration:
+    with open(private_key_path) as fd:
+        private_key = fd.read()
+
+    auth: AppAuth = Auth.AppAuth(app_id=github_app_id, private_key=private_key)
+    # Installation clients inherit the integration's retry, pool and page sizes, retry is off unless set explicitly.
+    # GithubRetry backs off on 5xx and honors Retry-After on (secondary) rate limit responses
+    return GithubIntegration(
+        auth=auth, retry=GithubRetry(), pool_size=GITHUB_API_POOL_SIZE, per_page=GITHUB_API_PER_PAGE
+    )
+
+
 def get_repository_github_app_api(config_: Config, repository_name: str) -> Optional[Github]:
     logger = get_logger_with_params(name="github-repository-settings")
 
     logger.debug("Getting repositories GitHub app API")
-    with open(os.path.join(config_.data_dir, "webhook-server.private-key.pem")) as fd:
-        private_key = fd.read()
+    private_key_path: str = os.path.join(config_.data_dir, "webhook-server.private-key.pem")
+    app_instance: GithubIntegration = _get_github_integration(
+        private_key_path=private_key_path,
+        private_key_mtime=os.path.getmtime(private_key_path),
+        github_app_id=config_.data["github-app-id"],
+    )
+    _cache_key: Tuple[GithubIntegration, str] = (app_instance, repository_name)
+    if _repository_app_api := _REPOSITORIES_APP_API.get(_cache_key):
+        return _repository_app_api
 
-    github_app_id: int = config_.data["github-app-id"]
-    auth: AppAuth = Auth.AppAuth(app_id=github_app_id, private_key=private_key)
-    app_instance: GithubIntegration = GithubIntegration(auth=auth)
     owner: str
     repo: str
     owner, repo = repository_name.split("/")
     try:
-        return app_instance.get_repo_installation(owner=owner, repo=repo).get_github_for_installation()
+        _repository_app_api = app_instance.get_repo_installation(owner=owner, repo=repo).get_github_for_installation()
+        with _REPOSITORIES_APP_API_LOCK:
+            return _REPOSITORIES_APP_API.setdefault(_cache_key, _repository_app_api)
+
     except UnknownObjectException:
         logger.error(
             f"Repository {repository_name} not found by manage-repositories-app, "
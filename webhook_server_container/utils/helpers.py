@@ -1,24 +1,47 @@
 from __future__ import annotations
 
+import contextlib
 import datetime
+import functools
 import shlex
 import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
 from concurrent.futures import Future, as_completed
 from logging import Logger
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import github
+import requests
 from colorama import Fore
 from github.RateLimit import RateLimit
 from github.Repository import Repository
+from requests.adapters import HTTPAdapter
 from simple_logger.logger import get_logger
 
 from webhook_server_container.libs.config import Config
 
+# Shared across the process so plain HTTP calls (e.g. Slack notifications) reuse keep-alive connections
+_REQUESTS_SESSION: requests.Session = requests.Session()
+_REQUESTS_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# PyGithub clients are shared by all threads of the process, the default pool of 10 connections per host would
+# discard and re-open (TLS handshake) connections whenever more threads call the API at once
+GITHUB_API_POOL_SIZE: int = 50
+# GitHub maximum page size, paginated lists (pull request files, check runs, labels...) take a third of the requests
+GITHUB_API_PER_PAGE: int = 100
+
+# Rate limits by token, picking the API for every webhook does not need to ask GitHub for each token every time
+RATE_LIMIT_CACHE_TTL: int = 30
+_RATE_LIMITS: Dict[str, Tuple[float, RateLimit]] = {}
+_RATE_LIMITS_LOCK = threading.Lock()
+
 
 def get_value_from_dicts(
-    primary_dict: Dict[Any, Any],
-    secondary_dict: Dict[Any, Any],
+    primary_dict: Mapping[Any, Any],
+    secondary_dict: Mapping[Any, Any],
     key: str,
     return_on_none: Optional[Any] = None,
 ) -> Any:
@@ -30,6 +53,10 @@ def get_value_from_dicts(
     return primary_dict.get(key, secondary_dict.get(key, return_on_none))
 
 
+def get_requests_session() -> requests.Session:
+    return _REQUESTS_SESSION
+
+
 def get_logger_with_params(name: str, repository_name: Optional[str] = "") -> Logger:
     _config = Config()
     config_data = _config.data  # Global repositories configuration
@@ -46,17 +73,19 @@ def get_logger_with_params(name: str, repository_name: Optional[str] = "") -> Lo
 
 
 def extract_key_from_dict(key: Any, _dict: Dict[Any, Any]) -> Any:
-    if isinstance(_dict, dict):
-        for _key, _val in _dict.items():
-            if _key == key:
-                yield _val
-            if isinstance(_val, dict):
-                for result in extract_key_from_dict(key, _val):
-                    yield result
-            elif isinstance(_val, list):
-                for _item in _val:
-                    for result in extract_key_from_dict(key, _item):
-                        yield result
+    # Breadth first without recursion, values closer to the top of the payload are yielded first
+    _to_visit: deque[Any] = deque([_dict])
+    while _to_visit:
+        _item = _to_visit.popleft()
+        if isinstance(_item, dict):
+            for _key, _val in _item.items():
+                if _key == key:
+                    yield _val
+                if isinstance(_val, (dict, list)):
+                    _to_visit.append(_val)
+
+        elif isinstance(_item, list):
+            _to_visit.extend(_val for _val in _item if isinstance(_val, (dict, list)))
 
 
 def get_github_repo_api(github_api: github.Github, repository: int | str) -> Repository:
@@ -72,6 +101,7 @@ def run_command(
     capture_output: bool = True,
     check: bool = False,
     pipe: bool = False,
+    output_max_size: Optional[int] = None,
     **kwargs: Any,
 ) -> Tuple[bool, Any, Any]:
     """
@@ -88,6 +118,8 @@ def run_command(
             CalledProcessError
         pipe (bool, default False): If pipe is True, text and capture_output would be set to False. stdout and
             stderr, would be set to subprocess.PIPE and passed to subprocess.run call
+        output_max_size (int, optional): Keep only the last output_max_size bytes of stdout and stderr, the command
+            output is written to temporary files instead of being held in memory
 
 
     Returns:
@@ -104,21 +136,38 @@ def run_command(
         kwargs["stderr"] = subprocess.PIPE
     try:
         logger.debug(f"{log_prefix} Running '{command}' command")
-        sub_process = subprocess.run(
-            shlex.split(command),
-            capture_output=capture_output,
-            check=check,
-            shell=shell,
-            text=text,
-            timeout=timeout,
-            **kwargs,
-        )
-        out_decoded = (
-            sub_process.stdout.decode(errors="ignore") if isinstance(sub_process.stdout, bytes) else sub_process.stdout
-        )
-        err_decoded = (
-            sub_process.stderr.decode(errors="ignore") if isinstance(sub_process.stderr, bytes) else sub_process.stderr
-        )
+        with contextlib.ExitStack() as output_files:
+            if output_max_size:
+                capture_output = False
+                text = False
+                kwargs["stdout"] = output_files.enter_context(tempfile.TemporaryFile())
+                kwargs["stderr"] = output_files.enter_context(tempfile.TemporaryFile())
+
+            sub_process = subprocess.run(
+                shlex.split(command),
+                capture_output=capture_output,
+                check=check,
+                shell=shell,
+                text=text,
+                timeout=timeout,
+                **kwargs,
+            )
+
+            if output_max_size:
+                out_decoded = _read_file_tail(file=kwargs["stdout"], size=output_max_size)
+                err_decoded = _read_file_tail(file=kwargs["stderr"], size=output_max_size)
+
+            else:
+                out_decoded = (
+                    sub_process.stdout.decode(errors="ignore")
+                    if isinstance(sub_process.stdout, bytes)
+                    else sub_process.stdout
+                )
+                err_decoded = (
+                    sub_process.stderr.decode(errors="ignore")
+                    if isinstance(sub_process.stderr, bytes)
+                    else sub_process.stderr
+                )
 
         error_msg = (
             f"{log_prefix} Failed to run '{command}'. "
@@ -140,6 +189,28 @@ def run_command(
         return False, out_decoded, err_decoded
 
 
+def _read_file_tail(file: Any, size: int) -> str:
+    file.seek(0, 2)
+    file.seek(max(file.tell() - size, 0))
+    return file.read().decode(errors="ignore")
+
+
+@functools.cache
+def get_github_api_for_token(token: str) -> github.Github:
+    """
+    Get GitHub API for token, one instance per token is kept for the process lifetime to reuse its connection pool.
+    """
+    return github.Github(auth=github.Auth.Token(token), pool_size=GITHUB_API_POOL_SIZE, per_page=GITHUB_API_PER_PAGE)
+
+
+@functools.cache
+def get_api_user_login(token: str) -> str:
+    """
+    Get the login of the token user, a token always belongs to the same user so it is fetched once per process.
+    """
+    return get_github_api_for_token(token=token).get_user().login
+
+
 def get_apis_and_tokes_from_config(config: Config, repository_name: str = "") -> List[Tuple[github.Github, str]]:
     apis_and_tokens: List[Tuple[github.Github, str]] = []
 
@@ -151,7 +222,7 @@ def get_apis_and_tokes_from_config(config: Config, repository_name: str = "") ->
     )
 
     for _token in tokens:
-        apis_and_tokens.append((github.Github(auth=github.Auth.Token(_token)), _token))
+        apis_and_tokens.append((get_github_api_for_token(token=_token), _token))
 
     return apis_and_tokens
 
@@ -180,12 +251,12 @@ def get_api_with_highest_rate_limit(
 
     apis_and_tokens = get_apis_and_tokes_from_config(config=config, repository_name=repository_name)
     for _api, _token in apis_and_tokens:
-        _api_user = _api.get_user().login
-        rate_limit = _api.get_rate_limit()
-        if rate_limit.core.remaining > remaining:
-            remaining = rate_limit.core.remaining
-            logger.debug(f"API user {_api_user} remaining rate limit: {remaining}")
-            api, token = _api, _token
+        _token_api_user = get_api_user_login(token=_token)
+        _rate_limit = get_rate_limit(github_api=_api, token=_token)
+        if _rate_limit.core.remaining > remaining:
+            remaining = _rate_limit.core.remaining
+            logger.debug(f"API user {_token_api_user} remaining rate limit: {remaining}")
+            api, token, _api_user, rate_limit = _api, _token, _token_api_user, _rate_limit
 
     if rate_limit:
         log_rate_limit(rate_limit=rate_limit, api_user=_api_user)
@@ -194,6 +265,20 @@ def get_api_with_highest_rate_limit(
     return api, token
 
 
+def get_rate_limit(github_api: github.Github, token: str) -> RateLimit:
+    with _RATE_LIMITS_LOCK:
+        _cached = _RATE_LIMITS.get(token)
+
+    if _cached and time.monotonic() - _cached[0] < RATE_LIMIT_CACHE_TTL:
+        return _cached[1]
+
+    rate_limit = github_api.get_rate_limit()
+    with _RATE_LIMITS_LOCK:
+        _RATE_LIMITS[token] = (time.monotonic(), rate_limit)
+
+    return rate_limit
+
+
 def log_rate_limit(rate_limit: RateLimit, api_user: str) -> None:
     logger = get_logger_with_params(name="helpers")
 
@@ -224,12 +309,15 @@ def get_future_results(futures: List["Future"]) -> None:
     """
     result must return Tuple[bool, str, Callable] when the Callable is Logger function (LOGGER.info, LOGGER.error, etc)
     """
+    logger = get_logger_with_params(name="helpers")
     for result in as_completed(futures):
+        # A failed task must not stop reporting the results of the remaining tasks
+        if _exp := result.exception():
+            logger.error(_exp)
+            continue
+
         _res = result.result()
         _log = _res[2]
-        if result.exception():
-            _log(result.exception())
-
         if _res[0]:
             _log(_res[1])
 
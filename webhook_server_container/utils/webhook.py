@@ -25,15 +25,15 @@ def process_github_webhook(data: Dict[str, Any], github_api: Github, webhook_ip:
     config_: Dict[str, str] = {"url": f"{webhook_ip}/webhook_server", "content_type": "json"}
     events: List[str] = data.get("events", ["*"])
 
+    # Iterate the paginated hooks lazily, stop fetching pages once the hook is found
     try:
-        hooks: List[Hook] = list(repo.get_hooks())
+        _hook: Hook
+        for _hook in repo.get_hooks():
+            if webhook_ip in _hook.config["url"]:
+                return True, f"{repository}: Hook already exists - {_hook.config['url']}", LOGGER.info
     except Exception as ex:
         return False, f"Could not list webhook for {repository}, check token permissions: {ex}", LOGGER.error
 
-    for _hook in hooks:
-        if webhook_ip in _hook.config["url"]:
-            return True, f"{repository}: Hook already exists - {_hook.config['url']}", LOGGER.info
-
     LOGGER.info(f"Creating webhook: {config_['url']} for {repository} with events: {events}")
     repo.create_hook(name="web", config=config_, events=events, active=True)
     return True, f"{repository}: Create webhook is done", LOGGER.info
@@ -41,11 +41,12 @@ def process_github_webhook(data: Dict[str, Any], github_api: Github, webhook_ip:
 
 def create_webhook(config_: Config, github_api: Github) -> None:
     LOGGER.info("Preparing webhook configuration")
-    webhook_ip = config_.data["webhook_ip"]
+    config_data = config_.data
+    webhook_ip = config_data["webhook_ip"]
 
     futures = []
     with ThreadPoolExecutor() as executor:
-        for _, data in config_.data["repositories"].items():
+        for _, data in config_data["repositories"].items():
             futures.append(
                 executor.submit(
                     process_github_webhook,